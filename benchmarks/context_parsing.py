@@ -0,0 +1,90 @@
+"""Micro-benchmark of the context parsing over recorded shadow payloads.
+
+Requires Home Assistant in the current environment, then from the
+repository root:
+
+    python -m benchmarks.context_parsing --iterations 20000
+
+Compares HonContextParser with the previous per-poll parsing, which copied
+every shadow parameter and normalized prPhase with an if cascade.
+"""
+import argparse
+import json
+import os
+import time
+
+from custom_components.hon.parser import HonContextParser
+
+PAYLOADS = os.path.join(os.path.dirname(__file__), "payloads")
+
+
+def legacy_parse(type_name, data):
+    """Parsing as done before HonContextParser"""
+    attributes = {}
+    parameters = data.pop("shadow", {"parameters": {}})["parameters"]
+    for name, values in parameters.items():
+        value = values["parNewVal"]
+        if name == "prPhase":
+            if type_name.upper() == "WM":
+                if value in ["0","10"]:
+                    value = "0"
+                elif value in ["1","2","14","15","16","25","27"]:
+                    value = "1"
+                elif value in ["3","11"]:
+                    value = "3"
+                elif value in ["4","5","6","17","18"]:
+                    value = "4"
+                elif value in ["7","8"]:
+                    value = "7"
+                elif value in ["12","13"]:
+                    value = "12"
+            if type_name.upper() == "TD":
+                if value in ["0","11"]:
+                    value = "0"
+                elif value in ["1","2","14","15","19","20"]:
+                    value = "1"
+                elif value in ["3","13","16"]:
+                    value = "3"
+                elif value in ["8","12","17"]:
+                    value = "8"
+        attributes[name] = value
+    attributes["lastConnEvent"] = data["lastConnEvent"]["category"]
+    return attributes
+
+
+def measure(function, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    for type_name in ["WM", "TD"]:
+        with open(os.path.join(PAYLOADS, f"{type_name.lower()}_context.json"), encoding="utf-8") as f:
+            payload = json.load(f)
+        context_parser = HonContextParser(type_name)
+
+        legacy = legacy_parse(type_name, dict(payload))
+        parsed = context_parser.parse_context(payload)
+        mismatches = [key for key in parsed if parsed[key] != legacy.get(key)]
+        if mismatches:
+            raise SystemExit(f"{type_name}: parsed values differ from the legacy parsing for {mismatches}")
+
+        # The legacy parsing pops the shadow, hence the shallow copy in both runs
+        legacy_us = measure(lambda: legacy_parse(type_name, dict(payload)), args.iterations)
+        parser_us = measure(lambda: context_parser.parse_context(dict(payload)), args.iterations)
+        print(
+            f"{type_name} {len(payload['shadow']['parameters']):>3} parameters | "
+            f"legacy {legacy_us:>6.2f}us ({len(legacy)} keys) | "
+            f"parser {parser_us:>6.2f}us ({len(parsed)} keys) | "
+            f"x{legacy_us / parser_us:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
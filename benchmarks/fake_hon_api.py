@@ -0,0 +1,219 @@
+"""Local stand-in of the hOn cloud endpoints used by HonConnection."""
+import asyncio
+import base64
+import json
+import time
+from collections import Counter
+
+from aiohttp import web
+
+PROGRAMS_PER_MODEL = 20
+
+
+def make_token(name, lifetime=86400):
+    """Unsigned JWT-like token, HonConnection only reads its exp claim"""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+    return f"{encode({'alg': 'none'})}.{encode({'sub': name, 'exp': int(time.time()) + lifetime})}.sig"
+
+
+def make_appliance(index, model_count):
+    model = index % model_count
+    type_name, type_id = ("WM", 1) if index % 2 == 0 else ("TD", 8)
+    return {
+        "macAddress": f"aa-bb-cc-{index:06x}",
+        "applianceTypeName": type_name,
+        "applianceTypeId": type_id,
+        "nickName": f"{type_name} {index}",
+        "brand": "candy",
+        "modelName": f"MODEL{model}",
+        "series": "benchmark",
+        "code": f"CODE{model}",
+        "applianceModelId": 1000 + model,
+        "eepromId": 2000 + model,
+        "fwVersion": "1.0.0",
+        "serialNumber": f"SN{index:08d}",
+        "topics": {"subscribe": [f"haier/things/aa-bb-cc-{index:06x}/event/appliancestatus/update"]},
+    }
+
+
+def make_parameters():
+    return {
+        "temp": {"typology": "enum", "enumValues": ["20", "30", "40", "60", "90"], "defaultValue": "40"},
+        "spinSpeed": {"typology": "range", "minimumValue": "400", "maximumValue": "1400", "incrementValue": "200", "defaultValue": "1000"},
+        "dirtyLevel": {"typology": "enum", "enumValues": ["1", "2", "3"], "defaultValue": "2"},
+        "prewash": {"typology": "range", "minimumValue": "0", "maximumValue": "1", "incrementValue": "1", "defaultValue": "0"},
+        "extraRinse1": {"typology": "range", "minimumValue": "0", "maximumValue": "1", "incrementValue": "1", "defaultValue": "0"},
+        "autoDetergentStatus": {"typology": "range", "minimumValue": "0", "maximumValue": "1", "incrementValue": "1", "defaultValue": "1"},
+        "autoSoftenerStatus": {"typology": "range", "minimumValue": "0", "maximumValue": "1", "incrementValue": "1", "defaultValue": "1"},
+        "onOffStatus": {"typology": "fixed", "mandatory": "1", "fixedValue": "1"},
+        "delayTime": {"typology": "range", "minimumValue": "0", "maximumValue": "1440", "incrementValue": "30", "defaultValue": "0"},
+        "lang": {"typology": "enum", "enumValues": ["0", "1", "2", "3"], "defaultValue": "1"},
+        "waterHard": {"typology": "enum", "enumValues": ["0", "1", "2", "3"], "defaultValue": "2"},
+    }
+
+
+def make_remaining_times():
+    return {
+        "dirtyLevel": {"1": "60", "2": "90", "3": "120", "default": "90"},
+        "temp": {"wash": {"20": "5", "30": "8", "40": "12", "60": "20", "90": "35"}},
+        "spinSpeed": {"spin": {"400": "4", "600": "5", "800": "6", "1000": "7", "1200": "8", "1400": "9"}},
+    }
+
+
+def make_catalog(type_name):
+    type_name = "WM_WD" if type_name == "WM" else type_name
+    programs = {}
+    for index in range(PROGRAMS_PER_MODEL):
+        programs[f"PROGRAMS.{type_name}.PROGRAM_{index}"] = {
+            "description": f"Program number {index}",
+            "parameters": make_parameters(),
+            "remainingTimes": make_remaining_times(),
+        }
+    return {"resultCode": "0", "startProgram": programs}
+
+
+""" (machMode, WM prPhase, TD prPhase, remainingTimeMM) of a scripted cycle, one step per context request """
+CYCLE = [
+    ("1", "0", "0", "0"),
+    ("2", "2", "14", "45"),
+    ("2", "2", "14", "40"),
+    ("2", "3", "1", "30"),
+    ("3", "3", "1", "30"),
+    ("2", "4", "3", "20"),
+    ("2", "4", "3", "10"),
+    ("2", "3", "3", "4"),
+    ("7", "0", "0", "0"),
+]
+
+
+def make_context(type_name, step=None):
+    mode, wm_phase, td_phase, remaining = ("2", "2", "14", "45") if step is None else CYCLE[step % len(CYCLE)]
+    parameters = {
+        "machMode": mode,
+        "prPhase": wm_phase if type_name == "WM" else td_phase,
+        "remainingTimeMM": remaining,
+        "delayTime": "0",
+        "temp": "40",
+        "spinSpeed": "1000",
+        "dryLevel": "2",
+        "remoteCtrValid": "1",
+        "errors": "00",
+        "detWarn": "0",
+        "softWarn": "0",
+    }
+    return {
+        "shadow": {"parameters": {name: {"parNewVal": value} for name, value in parameters.items()}},
+        "lastConnEvent": {"category": "CONNECTED"},
+    }
+
+
+class FakeHonApi:
+    """aiohttp server answering the login chain and the commands API"""
+    def __init__(self, appliance_count=1, model_count=None, latency=0.0):
+        self.latency = latency
+        self.appliances = [make_appliance(index, model_count or appliance_count) for index in range(appliance_count)]
+        self.requests = Counter()
+        self.throttle_next = 0 # commands API requests answered with a 429
+        self.retry_after = "1"
+        self.sent = [] # bodies of the commands received
+        self.fail_next_sends = 0 # commands answered with a 500
+        self.context_status = 200 # status of the context responses
+        self.cycle = False # contexts follow CYCLE instead of a fixed running state
+        self._steps = Counter()
+        self._runner = None
+        self.base_url = None
+
+    @property
+    def auth_api(self):
+        return f"{self.base_url}/SmartHome"
+
+    @property
+    def api_url(self):
+        return self.base_url
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.requests[request.path] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.throttle_next and request.path.startswith("/commands/"):
+            self.throttle_next -= 1
+            return web.json_response({"message": "Too Many Requests"}, status=429, headers={"Retry-After": self.retry_after})
+        return await handler(request)
+
+    async def _aura(self, request):
+        url = f"{self.auth_api}/secur/frontdoor.jsp"
+        return web.json_response({"events": [{"attributes": {"values": {"url": url}}}]})
+
+    async def _text(self, request):
+        return web.Response(text="<html></html>")
+
+    async def _authorize(self, request):
+        query = f"id_token={make_token('id')}&refresh_token=refresh&"
+        return web.Response(text=f"<script>window.location.replace('{query}')</script>")
+
+    async def _token(self, request):
+        return web.json_response({"id_token": make_token("id")})
+
+    async def _login(self, request):
+        return web.json_response({"cognitoUser": {"Token": make_token("cognito")}})
+
+    async def _introspection(self, request):
+        return web.json_response({"payload": {"tokenSigned": "signed"}})
+
+    async def _appliance(self, request):
+        return web.json_response({"payload": {"appliances": self.appliances}})
+
+    def _get_appliance(self, mac):
+        return next((appliance for appliance in self.appliances if appliance["macAddress"] == mac), None)
+
+    async def _retrieve(self, request):
+        appliance = self._get_appliance(request.query.get("macAddress"))
+        if appliance is None:
+            return web.json_response({"payload": {"resultCode": "1"}})
+        return web.json_response({"payload": make_catalog(appliance["applianceTypeName"])})
+
+    async def _context(self, request):
+        appliance = self._get_appliance(request.query.get("macAddress"))
+        if appliance is None:
+            return web.json_response({"payload": {}}, status=404)
+        if self.context_status != 200:
+            return web.json_response({"message": "Rejected"}, status=self.context_status)
+        step = None
+        if self.cycle:
+            step = self._steps[appliance["macAddress"]]
+            self._steps[appliance["macAddress"]] += 1
+        return web.json_response({"payload": make_context(appliance["applianceTypeName"], step)})
+
+    async def _send(self, request):
+        self.sent.append(await request.json())
+        if self.fail_next_sends:
+            self.fail_next_sends -= 1
+            return web.json_response({"message": "Internal Server Error"}, status=500)
+        return web.json_response({"payload": {"resultCode": "0"}})
+
+    async def async_start(self, host="127.0.0.1", port=0):
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post("/SmartHome/s/sfsites/aura", self._aura)
+        app.router.add_get("/SmartHome/secur/frontdoor.jsp", self._text)
+        app.router.add_get("/SmartHome/apex/ProgressiveLogin", self._text)
+        app.router.add_get("/SmartHome/services/oauth2/authorize", self._authorize)
+        app.router.add_post("/SmartHome/services/oauth2/token", self._token)
+        app.router.add_post("/auth/v1/login", self._login)
+        app.router.add_get("/auth/v1/introspection", self._introspection)
+        app.router.add_get("/commands/v1/appliance", self._appliance)
+        app.router.add_get("/commands/v1/retrieve", self._retrieve)
+        app.router.add_get("/commands/v1/context", self._context)
+        app.router.add_post("/commands/v1/send", self._send)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+
+    async def async_stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -0,0 +1,37 @@
+"""In-process stand-in of the hOn push broker used by HonPush."""
+import asyncio
+
+from custom_components.hon.push import HonPushTransport
+
+
+class FakeHonPushTransport(HonPushTransport):
+    """Connects at once unless told to fail, the caller publishes the messages and drops the connection"""
+    def __init__(self) -> None:
+        super().__init__()
+        self.connects = 0
+        self.subscribed = []
+        self.fail_connect = False
+
+    async def async_connect(self):
+        self.connects += 1
+        if self.fail_connect:
+            raise ConnectionError("Fake broker unreachable")
+        # Acknowledged later like a real broker, after async_connect returned
+        asyncio.get_running_loop().call_soon(self.connection_changed, True)
+
+    async def async_subscribe(self, topics):
+        self.subscribed.extend(topics)
+
+    async def async_disconnect(self):
+        pass
+
+    def publish(self, topic, payload):
+        self.message_received(topic, payload)
+
+    def drop(self):
+        self.connection_changed(False)
+
+
+def get_topics(mac):
+    """Topics of an appliance on the hOn broker"""
+    return [f"haier/things/{mac}/event/{event}" for event in ["appliancestatus/update", "connected", "disconnected"]]
@@ -0,0 +1,218 @@
+"""Replay of a recorded hOn commands API capture, without network.
+
+A capture is written by the hon.start_recording / hon.stop_recording
+services (hon_capture_*.jsonl.gz in the configuration folder), or
+synthesized from the fake hOn API:
+
+    python -m benchmarks.replay record capture.jsonl.gz --appliances 4 --polls 9
+
+Then, from the repository root:
+
+    python -m benchmarks.replay replay capture.jsonl.gz --speed 0
+
+The appliances of the capture are bootstrapped from the recorded catalogs,
+requested while recording or already loaded when it started, and every recorded context goes through the parser, the device and the
+entities in the recorded order. --speed 1 keeps the recorded timing, 0
+replays as fast as possible. Parse, apply and entity update times are
+reported per context, for the same capture across releases.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import Counter, defaultdict, deque
+
+from homeassistant.components.notify import SERVICE_PERSISTENT_NOTIFICATION
+from homeassistant.components.notify import DOMAIN as NOTIFICATION_DOMAIN
+
+from custom_components.hon import hon as hon_module
+from custom_components.hon.const import DOMAIN
+from custom_components.hon.hon import HonConnection
+from custom_components.hon.metrics import get_endpoint_name
+from custom_components.hon.ratelimit import HonRateLimiter
+from custom_components.hon.recorder import RECORDED_ENDPOINTS, read_records
+from custom_components.hon.storage import get_catalog_key, get_catalog_storage
+
+from .fake_hon_api import FakeHonApi
+from .run import async_create_hass, async_setup_devices, async_setup_platforms, summary
+
+
+class HonReplayConnection(HonConnection):
+    """Serves the recorded responses of every appliance in order, the last one once exhausted"""
+    def __init__(self, hass, entry, records) -> None:
+        super().__init__(hass, entry)
+        self._appliances = [record["response"] for record in records if record["endpoint"] == "appliance"]
+        self._responses = defaultdict(deque)
+        self._last = {}
+        for record in records:
+            if record["endpoint"] in ["retrieve", "context"]:
+                self._responses[(record["endpoint"], record["appliance"])].append(record)
+        self.sent = Counter()
+
+    async def async_authorize(self):
+        return True
+
+    async def async_api_request(self, method, url, priority=None, **kwargs):
+        endpoint = RECORDED_ENDPOINTS.get(get_endpoint_name(url))
+        request = kwargs.get("params") or kwargs.get("json") or {}
+        if endpoint == "send":
+            self.sent[request.get("commandName")] += 1
+            return 200, {"payload": {"resultCode": "0"}}
+        key = (endpoint, request.get("macAddress"))
+        if self._responses[key]:
+            self._last[key] = self._responses[key].popleft()
+        record = self._last.get(key)
+        if record is None:
+            return 404, {"payload": {}}
+        return record["status"], record["response"]
+
+    def remaining(self, alias):
+        return self._responses[("context", alias)]
+
+
+async def async_load_catalogs(hass, hon, records):
+    """Catalogs already loaded when the capture started, never requested in it"""
+    appliances = {appliance["macAddress"]: appliance for appliance in hon.appliances}
+    catalogs = get_catalog_storage(hass)
+    await catalogs.async_load()
+    for record in records:
+        if record["endpoint"] == "catalog" and record["appliance"] in appliances:
+            catalogs.set(get_catalog_key(appliances[record["appliance"]]), record["response"])
+
+
+async def async_record(args):
+    """Capture a scripted washing cycle of the fake hOn API"""
+    hass, entry = await async_create_hass("hon_record_", "record")
+    hass.data[DOMAIN]["rate_limiter"] = HonRateLimiter(10000, 10000)
+    hass.services.async_register(NOTIFICATION_DOMAIN, SERVICE_PERSISTENT_NOTIFICATION, lambda call: None)
+
+    api = FakeHonApi(args.appliances, None, 0)
+    api.cycle = True
+    await api.async_start()
+    hon_module.AUTH_API = api.auth_api
+    hon_module.API_URL = api.api_url
+
+    hon = HonConnection(hass, entry)
+    await hon.async_authorize()
+    if not args.late:
+        hon.start_recording(args.capture)
+    devices, results = await async_setup_devices(hass, entry, hon)
+    if args.late:
+        hon.start_recording(args.capture)
+    for _ in range(args.polls):
+        for coordinator in hon._coordinator_dict.values():
+            coordinator._last_poll = 0
+        await hon.async_poll_contexts()
+        await asyncio.sleep(args.interval)
+    for device in devices:
+        await hon.send_command(device, "stopProgram", {"onOffStatus": "0"})
+
+    recorder = await hon.async_stop_recording()
+    await hon.async_close()
+    await api.async_stop()
+    await hass.async_stop(force=True)
+    print(f"{recorder.count} records of {len(devices)} appliances written to {recorder.path}")
+    return recorder
+
+
+async def async_replay(args):
+    records = read_records(args.capture)
+    contexts = [record for record in records if record["endpoint"] == "context"]
+
+    hass, entry = await async_create_hass("hon_replay_", "replay")
+    notifications = []
+    hass.services.async_register(NOTIFICATION_DOMAIN, SERVICE_PERSISTENT_NOTIFICATION, notifications.append)
+
+    hon = HonReplayConnection(hass, entry, records)
+    start = time.perf_counter()
+    await async_load_catalogs(hass, hon, records)
+    devices, results = await async_setup_devices(hass, entry, hon)
+    entities = await async_setup_platforms(hass, entry)
+    setup_time = time.perf_counter() - start
+    by_alias = {device._mac: device for device in devices}
+
+    parse_times = []
+    apply_times = []
+    entity_times = []
+    replayed = 0
+    previous = None
+    for record in contexts:
+        device = by_alias.get(record["appliance"])
+        queue = hon.remaining(record["appliance"])
+        if device is None or not queue or queue[0] is not record:
+            # Already consumed by the bootstrap
+            continue
+        if args.speed and previous is not None:
+            await asyncio.sleep(max(record["t"] - previous, 0) / args.speed)
+        previous = record["t"]
+
+        start = time.perf_counter()
+        device._parser.parse_context(record["response"].get("payload", {}))
+        parse_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await device.get_context()
+        apply_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        device.update_entities()
+        for entity in entities:
+            if entity.coordinator is device.coordinator:
+                entity._handle_coordinator_update()
+        entity_times.append(time.perf_counter() - start)
+        replayed += 1
+
+    await hon.async_close()
+    await hass.async_stop(force=True)
+
+    result = {
+        "capture": args.capture,
+        "appliances": len(devices),
+        "entities": len(entities),
+        "setup_s": round(setup_time, 3),
+        "contexts": replayed,
+        "commands": sum(1 for record in records if record["endpoint"] == "send"),
+        "commands_sent": sum(hon.sent.values()),
+        "notifications": len(notifications),
+        "parse": summary(parse_times),
+        "apply": summary(apply_times),
+        "entity_update": summary(entity_times),
+    }
+    print(
+        f"{result['appliances']:>4} appliances {result['entities']:>5} entities | "
+        f"{result['contexts']} contexts replayed, {result['notifications']} notifications | "
+        f"parse {result['parse']['mean_ms']:>7.3f}ms | "
+        f"apply {result['apply']['mean_ms']:>7.3f}ms p95 {result['apply']['p95_ms']:>7.3f}ms | "
+        f"entities {result['entity_update']['mean_ms']:>7.3f}ms p95 {result['entity_update']['p95_ms']:>7.3f}ms"
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+    record = subparsers.add_parser("record", help="capture a cycle of the fake hOn API")
+    record.add_argument("capture")
+    record.add_argument("--appliances", type=int, default=4)
+    record.add_argument("--polls", type=int, default=9, help="context polls recorded")
+    record.add_argument("--interval", type=float, default=0.1, help="seconds between two polls")
+    record.add_argument("--late", action="store_true", help="start recording after the bootstrap, as the start_recording service does")
+    replay = subparsers.add_parser("replay", help="replay a capture")
+    replay.add_argument("capture")
+    replay.add_argument("--speed", type=float, default=0, help="factor of the recorded timing, 0 as fast as possible")
+    replay.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    # Entities are not added through an entity platform on purpose
+    logging.getLogger("homeassistant.helpers.entity").setLevel(logging.ERROR)
+    logging.getLogger("homeassistant.loader").setLevel(logging.ERROR)
+    asyncio.run(async_record(args) if args.mode == "record" else async_replay(args))
+
+
+if __name__ == "__main__":
+    main()
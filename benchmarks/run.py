@@ -0,0 +1,245 @@
+"""Offline benchmarks of the hOn integration against a local fake hOn API.
+
+Requires Home Assistant in the current environment, then from the
+repository root:
+
+    python -m benchmarks.run --appliances 1 10 50 100 --latency 0.02
+
+For every appliance count it measures the entry setup (login chain,
+bootstrap of all the appliances), the latency of an account poll cycle,
+the longest and total event loop blocking time and the cost of a
+coordinator update over all the entities.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+# The core module first, the loader cannot be imported on its own
+from homeassistant.core import HomeAssistant
+from homeassistant import loader
+from homeassistant.config_entries import ConfigEntries
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.helpers import translation
+
+from custom_components.hon import async_bootstrap_devices
+from custom_components.hon import hon as hon_module
+from custom_components.hon import binary_sensor, select, switch
+from custom_components.hon.const import DOMAIN
+from custom_components.hon.device import HonDevice
+from custom_components.hon.hon import HonConnection
+from custom_components.hon.ratelimit import HonRateLimiter, REQUEST_RATE, REQUEST_BURST
+from custom_components.hon.storage import HonStorage, get_catalog_storage
+from custom_components.hon.translator import HonTranslator, HonTranslatorBackend
+
+from .fake_hon_api import FakeHonApi
+
+
+class OfflineTranslatorBackend(HonTranslatorBackend):
+    def translate_batch(self, strings, target):
+        return [f"[{target}] {string}" for string in strings]
+
+
+class LoopLagMonitor:
+    """Measures how late a short periodic sleep wakes up, i.e. how long the loop was blocked"""
+    def __init__(self, interval=0.005, threshold=0.001):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0
+        self.total_lag = 0
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - start - self.interval
+            if lag > self.threshold:
+                self.max_lag = max(self.max_lag, lag)
+                self.total_lag += lag
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def create_config_dir(prefix, name):
+    """Configuration folder of an install with the integration and one config entry"""
+    config_dir = tempfile.mkdtemp(prefix=prefix)
+    os.symlink(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "custom_components")), os.path.join(config_dir, "custom_components"))
+    os.makedirs(os.path.join(config_dir, ".storage"))
+    entry = {
+        "entry_id": name,
+        "version": 1,
+        "minor_version": 4,
+        "domain": DOMAIN,
+        "title": name,
+        "data": {CONF_EMAIL: f"{name}@example.com", CONF_PASSWORD: name},
+        "options": {},
+        "source": "user",
+        "unique_id": f"{name}@example.com",
+        "pref_disable_new_entities": False,
+        "pref_disable_polling": False,
+    }
+    with open(os.path.join(config_dir, ".storage", "core.config_entries"), "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "minor_version": 1, "key": "core.config_entries", "data": {"entries": [entry]}}, f)
+    return config_dir
+
+
+async def async_create_hass(prefix, name):
+    """Home Assistant with the config entry registered and the translations loadable, returns (hass, entry)"""
+    hass = HomeAssistant(create_config_dir(prefix, name))
+    hass.config.language = "en"
+    loader.async_setup(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    hass.config.components.add(DOMAIN)
+    hass.data[DOMAIN] = {"configuration_yaml": None}
+    hass.data[DOMAIN]["translator"] = HonTranslator(hass, OfflineTranslatorBackend())
+    return hass, hass.config_entries.async_entries(DOMAIN)[0]
+
+
+async def async_setup_devices(hass, entry, hon):
+    """Same steps as async_setup_entry, without the polling and the push channel"""
+    hass.data[DOMAIN][entry.unique_id] = hon
+    storage = HonStorage(hass, entry)
+    await storage.async_load()
+    hon.storage = storage
+    await get_catalog_storage(hass).async_load()
+    translations = await translation.async_get_translations(hass, hass.config.language, "entity")
+    devices = []
+    for appliance in hon.appliances:
+        coordinator = await hon.async_get_coordinator(appliance)
+        coordinator.device = HonDevice(entry, hon, coordinator, appliance, translations, storage)
+        devices.append(coordinator.device)
+    results = await async_bootstrap_devices(devices)
+    for device, ready in zip(devices, results):
+        if ready:
+            device.set_ready()
+    return devices, results
+
+
+async def async_setup_platforms(hass, entry):
+    entities = []
+    for platform in [switch, select, binary_sensor]:
+        await platform.async_setup_entry(hass, entry, entities.extend)
+    for index, entity in enumerate(entities):
+        # Written to the state machine without an entity platform
+        entity.hass = hass
+        entity.entity_id = f"{DOMAIN}.benchmark_{index}"
+        entity._attr_has_entity_name = False
+        entity._attr_name = entity.entity_id
+    return entities
+
+
+def summary(values):
+    if not values:
+        return {"mean_ms": 0, "p95_ms": 0}
+    values = sorted(values)
+    return {
+        "mean_ms": round(statistics.mean(values) * 1000, 3),
+        "p95_ms": round(values[int(len(values) * 0.95) - 1 if len(values) > 1 else 0] * 1000, 3),
+    }
+
+
+async def async_run_scenario(appliance_count, latency, polls, models, rate):
+    hass, entry = await async_create_hass("hon_benchmark_", "benchmark")
+    hass.data[DOMAIN]["rate_limiter"] = HonRateLimiter(rate, max(REQUEST_BURST, rate * 2))
+
+    api = FakeHonApi(appliance_count, models, latency)
+    await api.async_start()
+    hon_module.AUTH_API = api.auth_api
+    hon_module.API_URL = api.api_url
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+
+    start = time.perf_counter()
+    hon = HonConnection(hass, entry)
+    await hon.async_authorize()
+    devices, results = await async_setup_devices(hass, entry, hon)
+    entities = await async_setup_platforms(hass, entry)
+    setup_time = time.perf_counter() - start
+    setup_requests = sum(api.requests.values())
+
+    poll_times = []
+    for _ in range(polls):
+        for coordinator in hon._coordinator_dict.values():
+            coordinator._last_poll = 0
+        start = time.perf_counter()
+        await hon.async_poll_contexts()
+        poll_times.append(time.perf_counter() - start)
+
+    update_times = []
+    for _ in range(polls):
+        start = time.perf_counter()
+        for entity in entities:
+            entity._handle_coordinator_update()
+        update_times.append(time.perf_counter() - start)
+
+    await monitor.stop()
+    await hon.async_close()
+    await api.async_stop()
+    await hass.async_stop(force=True)
+
+    return {
+        "appliances": appliance_count,
+        "entities": len(entities),
+        "ready": sum(1 for ready in results if ready),
+        "setup_s": round(setup_time, 3),
+        "setup_requests": setup_requests,
+        "poll": summary(poll_times),
+        "entity_update": summary(update_times),
+        "loop_max_block_ms": round(monitor.max_lag * 1000, 3),
+        "loop_total_block_ms": round(monitor.total_lag * 1000, 3),
+    }
+
+
+async def async_main(args):
+    results = []
+    for appliance_count in args.appliances:
+        result = await async_run_scenario(appliance_count, args.latency, args.polls, args.models, args.rate)
+        results.append(result)
+        print(
+            f"{result['appliances']:>4} appliances {result['entities']:>5} entities | "
+            f"setup {result['setup_s']:>7.3f}s ({result['setup_requests']} requests) | "
+            f"poll {result['poll']['mean_ms']:>8.2f}ms p95 {result['poll']['p95_ms']:>8.2f}ms | "
+            f"entities {result['entity_update']['mean_ms']:>8.2f}ms | "
+            f"loop block max {result['loop_max_block_ms']:>7.2f}ms total {result['loop_total_block_ms']:>8.2f}ms"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--appliances", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every fake API response")
+    parser.add_argument("--polls", type=int, default=10, help="poll cycles and entity updates measured")
+    parser.add_argument("--models", type=int, default=None, help="distinct appliance models, default one per appliance")
+    parser.add_argument("--rate", type=float, default=REQUEST_RATE, help="requests per second allowed by the rate limiter, raise it to measure the client alone")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    # Entities are not added through an entity platform on purpose
+    logging.getLogger("homeassistant.helpers.entity").setLevel(logging.ERROR)
+    # Custom integration warning of the loader
+    logging.getLogger("homeassistant.loader").setLevel(logging.ERROR)
+    asyncio.run(async_main(args))
+
+
+if __name__ == "__main__":
+    main()
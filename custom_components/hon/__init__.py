@@ -1,22 +1,50 @@
 import logging
+import asyncio
 import voluptuous as vol
 
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers import translation
-
-from .const import DOMAIN, PLATFORMS, CONF_MAC, CONF_DISABLED_PROGRAMS, CONF_SOFTENER_REMAINING_TIME
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    PLATFORMS,
+    CONF_MAC,
+    CONF_DISABLED_PROGRAMS,
+    CONF_SOFTENER_REMAINING_TIME,
+    CONF_POLL_INTERVAL_RUNNING,
+    CONF_POLL_INTERVAL_ENDING,
+    CONF_POLL_INTERVAL_IDLE,
+    CONF_POLL_INTERVAL_OFFLINE,
+    CONF_PUSH,
+    CONF_CURRENT_PROGRAM,
+    CONF_PROGRAMS_SETTINGS,
+    CONF_GLOBAL_SETTINGS
+)
 from .hon import HonConnection
 from .device import HonDevice
+from .storage import HonStorage, get_catalog_storage
+from .push import HonPush, HonAwsIotTransport
+from .logs import log_payload
 
 _LOGGER = logging.getLogger(__name__)
 
+BOOTSTRAP_CONCURRENCY   = 3
+BOOTSTRAP_TIMEOUT       = 60 # seconds before an appliance is retried in background
+BOOTSTRAP_RETRY_DELAY   = 120 # seconds between background retries
+
 HON_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_MAC): cv.string,
         CONF_DISABLED_PROGRAMS: vol.All(cv.ensure_list, [cv.string]),
-        vol.Optional(CONF_SOFTENER_REMAINING_TIME): int
+        vol.Optional(CONF_SOFTENER_REMAINING_TIME): int,
+        vol.Optional(CONF_POLL_INTERVAL_RUNNING): cv.positive_int,
+        vol.Optional(CONF_POLL_INTERVAL_ENDING): cv.positive_int,
+        vol.Optional(CONF_POLL_INTERVAL_IDLE): cv.positive_int,
+        vol.Optional(CONF_POLL_INTERVAL_OFFLINE): cv.positive_int,
+        vol.Optional(CONF_PUSH, default=False): cv.boolean
     }
 )
 
@@ -39,33 +67,147 @@ def update_sensor(hass, device_id, mac, sensor_name, state):
             hass.states.async_set(entry.entity_id, state, inputStateObject.attributes)
 
 
+async def async_bootstrap_device(device):
+    """First context refresh and program catalog load"""
+    await device.coordinator.async_refresh()
+    if not device.coordinator.last_update_success:
+        return False
+    try:
+        await device.get_programs()
+    except Exception as err:
+        _LOGGER.warning(f"Unable to load programs for mac[{device._mac}]: {err}")
+        return False
+    return len(device.programs) > 0
+
+
+async def async_bootstrap_devices(devices):
+    """Bootstrap the appliances concurrently, returns the success of each one"""
+    semaphore = asyncio.Semaphore(BOOTSTRAP_CONCURRENCY)
+
+    async def bootstrap(device):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(async_bootstrap_device(device), BOOTSTRAP_TIMEOUT)
+            except asyncio.TimeoutError:
+                _LOGGER.warning(f"Bootstrap of mac[{device._mac}] timed out")
+                return False
+
+    return await asyncio.gather(*[bootstrap(device) for device in devices])
+
+
+async def async_retry_bootstrap(hass, entry, device):
+    had_programs = len(device.programs) > 0
+    while True:
+        await asyncio.sleep(BOOTSTRAP_RETRY_DELAY)
+        try:
+            if await asyncio.wait_for(async_bootstrap_device(device), BOOTSTRAP_TIMEOUT):
+                break
+        except asyncio.TimeoutError:
+            pass
+        _LOGGER.debug(f"Bootstrap of mac[{device._mac}] failed, retry in {BOOTSTRAP_RETRY_DELAY}s")
+
+    _LOGGER.info(f"Appliance mac[{device._mac}] is now ready")
+    device.set_ready()
+    if not had_programs:
+        # Program entities could not be created without a catalog
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+
+
 async def async_setup_entry(hass, entry):
     hon = HonConnection(hass, entry)
     await hon.async_authorize()
 
-    _LOGGER.debug(f"Appliances: {hon.appliances}")
+    log_payload("appliances", "Appliances:", payload=hon.appliances)
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.unique_id] = hon
 
+    storage = HonStorage(hass, entry)
+    await storage.async_load()
+    hon.storage = storage
+    await storage.async_import_legacy([appliance["macAddress"] for appliance in hon.appliances])
+    await get_catalog_storage(hass).async_load()
+
     translations = await translation.async_get_translations(hass, hass.config.language, "entity")
 
+    devices = []
     for appliance in hon.appliances:
         coordinator = await hon.async_get_coordinator(appliance)
-        coordinator.device = HonDevice(entry, hon, coordinator, appliance, translations)
-        await coordinator.async_config_entry_first_refresh()
-        await coordinator.device.get_programs()
+        coordinator.device = HonDevice(entry, hon, coordinator, appliance, translations, storage)
+        devices.append(coordinator.device)
+
+    results = await async_bootstrap_devices(devices)
+
+    for device, ready in zip(devices, results):
+        if ready:
+            device.set_ready()
+        else:
+            _LOGGER.warning(f"Appliance mac[{device._mac}] not ready, retrying in background")
+            entry.async_create_background_task(hass, async_retry_bootstrap(hass, entry, device), f"{DOMAIN}_bootstrap_{device._mac}")
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    hon.async_start_polling()
+
+    push_devices = [device for device in devices if device.get_yaml_config(CONF_PUSH)]
+    if push_devices and not HonAwsIotTransport.is_installed():
+        _LOGGER.warning("Push updates require the awsiotsdk package, using polling only")
+    elif push_devices:
+        push = HonPush(hass, HonAwsIotTransport(hass, hon))
+        for device in push_devices:
+            topics = device._appliance.get("topics", {}).get("subscribe", [])
+            if topics:
+                push.add_device(device, topics)
+        hon.push = push
+        entry.async_create_background_task(hass, push.async_run(), f"{DOMAIN}_push")
+
     return True
 
 
+async def async_unload_entry(hass, entry):
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        hon = hass.data[DOMAIN].pop(entry.unique_id)
+        if hon.push is not None:
+            await hon.push.async_stop()
+        for device in hon.devices:
+            await device.async_shutdown()
+        # A reload reads the file again, pending overrides must not be lost
+        await hon.storage.async_flush()
+        await hon.async_close()
+    return unload_ok
+
+
+async def async_remove_entry(hass, entry):
+    """Per-mac overrides of the account, the catalogs and translations are shared and kept"""
+    await HonStorage(hass, entry).async_remove()
+
+
+def get_connections(hass):
+    return [value for value in hass.data.get(DOMAIN, {}).values() if isinstance(value, HonConnection)]
+
+
 async def async_setup(hass, config):
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN]["configuration_yaml"] = config.get(DOMAIN)
 
+    async def async_start_recording(call):
+        stamp = dt_util.now().strftime("%Y%m%d_%H%M%S")
+        for index, hon in enumerate(get_connections(hass)):
+            path = hass.config.path(f"{DOMAIN}_capture_{stamp}_{index}.jsonl.gz")
+            hon.start_recording(path)
+            _LOGGER.info(f"Recording hOn API traffic to [{path}]")
+
+    async def async_stop_recording(call):
+        for hon in get_connections(hass):
+            recorder = await hon.async_stop_recording()
+            if recorder is not None:
+                _LOGGER.info(f"Recorded {recorder.count} records to [{recorder.path}]")
+
+    hass.services.async_register(DOMAIN, "start_recording", async_start_recording)
+    hass.services.async_register(DOMAIN, "stop_recording", async_stop_recording)
+
     return True
 
 
@@ -94,4 +236,13 @@ async def async_migrate_entry(hass, config):
                     config.data[key]["options"] = {}
         hass.config_entries.async_update_entry(config, data=config.data, minor_version=3)
 
+    if config.version == 1 and config.minor_version < 4:
+        _LOGGER.debug("Update to 1.4")
+        # Program and settings overrides move to the account storage
+        storage = HonStorage(hass, config)
+        await storage.async_load()
+        data = storage.import_entry_data(config.data, [CONF_CURRENT_PROGRAM, CONF_PROGRAMS_SETTINGS, CONF_GLOBAL_SETTINGS])
+        await storage.async_flush()
+        hass.config_entries.async_update_entry(config, data=data, minor_version=4)
+
     return True
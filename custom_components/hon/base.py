@@ -1,7 +1,7 @@
 import logging
 import re
+import time
 from typing import Any
-from datetime import timedelta
 
 from homeassistant.helpers.update_coordinator import ( DataUpdateCoordinator, CoordinatorEntity )
 from homeassistant.core import callback
@@ -9,7 +9,7 @@ from homeassistant.components.select import SelectEntity
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.components.binary_sensor import BinarySensorEntity
 
-from .const import DOMAIN, APPLIANCE_DEFAULT_NAME
+from .const import DOMAIN, APPLIANCE_DEFAULT_NAME, DEVICE_STATE_KEYS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,11 +20,13 @@ class HonBaseCoordinator(DataUpdateCoordinator):
             hass,
             _LOGGER,
             name="hOn Device",
-            update_interval=timedelta(seconds=30),
+            # Polled by the account scheduler in HonConnection
+            update_interval=None,
         )
         self._hon       = hon
         self._device    = None
         self._appliance = appliance
+        self._last_poll = 0
 
         try:
             self._mac           = appliance["macAddress"]
@@ -39,8 +41,28 @@ class HonBaseCoordinator(DataUpdateCoordinator):
 
 
     async def _async_update_data(self):
+        self._last_poll = time.monotonic()
         await self._device.get_context()
 
+    @property
+    def next_poll(self):
+        """Monotonic time of the next scheduled context poll"""
+        return self._last_poll + self._device.poll_interval
+
+    async def async_handle_context(self, result):
+        """Apply a context fetched by the account scheduler"""
+        self._last_poll = time.monotonic()
+        if isinstance(result, Exception):
+            self.async_set_update_error(result)
+            return
+        try:
+            await self._device.process_context(result)
+        except Exception as err:
+            _LOGGER.exception(f"Unable to process context for mac[{self._mac}]")
+            self.async_set_update_error(err)
+            return
+        self.async_set_updated_data(None)
+
     @property
     def device(self):
         return self._device
@@ -68,9 +90,17 @@ class HonBaseCoordinator(DataUpdateCoordinator):
         }
 
 class HonBaseEntity(CoordinatorEntity):
+    """Skip the update when neither the context keys nor the program settings changed"""
+    _skip_unchanged = True
+    _context_keys = DEVICE_STATE_KEYS
+
     def __init__(self, coordinator, appliance, description):
         super().__init__(coordinator)
 
+        self._seen_data_generation = -1
+        self._seen_config_generation = None
+        self._last_snapshot = None
+
         """Hon properties"""
         self._coordinator           = coordinator
         self._mac                   = appliance["macAddress"]
@@ -109,8 +139,44 @@ class HonBaseEntity(CoordinatorEntity):
 
     @property
     def available(self) -> bool:
-        """Entity is available"""
-        return True
+        """Entity is available, not while the last context fetch failed"""
+        return self._device.is_ready and self._coordinator.last_update_success
+
+    @property
+    def context_keys(self):
+        """Context keys the entity depends on, None for all of them"""
+        return self._context_keys
+
+    def has_device_changes(self):
+        """Context keys or program settings changed since the last update"""
+        changed = self._device.changed_since(self.context_keys, self._seen_data_generation)
+        config_generation = (self._device.generation, self._device.is_ready, self._coordinator.last_update_success)
+        if config_generation != self._seen_config_generation:
+            changed = True
+        self._seen_data_generation = self._device.data_generation
+        self._seen_config_generation = config_generation
+        return changed
+
+    @callback
+    def _handle_coordinator_update(self):
+        if self._coordinator.data is False:
+            return
+        if self._skip_unchanged and not self.has_device_changes():
+            return
+        self.coordinator_update()
+        self.async_write_ha_state_if_changed()
+
+    @callback
+    def async_write_ha_state_if_changed(self):
+        """Write the state only when it differs from the last written one"""
+        snapshot = (self.available, self.state, self.capability_attributes, self.extra_state_attributes)
+        if snapshot == self._last_snapshot:
+            return
+        self._last_snapshot = snapshot
+        self.async_write_ha_state()
+
+    def coordinator_update(self):
+        """Update entity state"""
 
 
 """Used for update device settings"""
@@ -123,14 +189,8 @@ class HonBaseSensor(HonBaseEntity):
 
     @property
     def available(self) -> bool:
-        return self._device.get_current_program_param(self.entity_description.key) != None and "type" in self._device.get_current_program_param(self.entity_description.key) and self._device.is_on and (not self._device.is_running)
-
-    @callback
-    def _handle_coordinator_update(self):
-        if self._coordinator.data is False:
-            return
-        self.coordinator_update()
-        self.async_write_ha_state()
+        param = self._device.get_current_program_param(self.entity_description.key)
+        return param != None and "type" in param and self._device.is_available and (not self._device.is_running)
 
     def coordinator_update(self):
         """Update entity state"""
@@ -186,12 +246,9 @@ class HonBaseBinarySensor(HonBaseEntity, BinarySensorEntity):
         """First update"""
         self.coordinator_update()
 
-    @callback
-    def _handle_coordinator_update(self):
-        if self._coordinator.data is False:
-            return
-        self.coordinator_update()
-        self.async_write_ha_state()
+    @property
+    def context_keys(self):
+        return [self.entity_description.key]
 
     def coordinator_update(self):
         """Update entity state"""
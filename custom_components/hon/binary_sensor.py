@@ -4,7 +4,7 @@ from datetime import timedelta
 from homeassistant.components.binary_sensor import BinarySensorEntityDescription
 from homeassistant.helpers import translation
 
-from .const import DOMAIN, SENSORS_DEFAULT
+from .const import DOMAIN, SENSORS_DEFAULT, DEVICE_STATE_KEYS
 from .base import HonBaseBinarySensor
 from .utils import get_datetime
 
@@ -41,38 +41,29 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
             )
             appliances.extend([HonBaseBinarySensor(coordinator, appliance, description, translations)])
 
-        await coordinator.async_request_refresh()
-
     async_add_entities(appliances)
 
 
 class HonDevice(HonBaseBinarySensor):
+    _context_keys = DEVICE_STATE_KEYS + ["error", "errors", "temp", "dryLevel", "prPhase", "spinSpeed", "remainingTimeMM", "delayTime"]
+    _seen_queue_generation = None
+
+    @property
+    def context_keys(self):
+        return self._context_keys
+
+    def has_device_changes(self):
+        changed = super().has_device_changes()
+        queue_generation = self._device.command_queue.generation
+        if queue_generation != self._seen_queue_generation:
+            changed = True
+        self._seen_queue_generation = queue_generation
+        return changed
+
     def get_program_duration(self):
-        program_data = self._device.get_program(self._device.current_program_name)
-        if "timing" not in program_data:
+        timing = self._device.get_program_duration(self._device.current_program_name)
+        if timing is None:
             return None
-        timing = 0
-        timing_data = program_data["timing"]
-        for option in timing_data:
-            if self._device.get_current_program_param(option) and "value" in self._device.get_current_program_param(option):
-                option_setting = self._device.get_current_program_param(option)["value"]
-                option_setting = str(option_setting)
-                if option in ["dirtyLevel","dryLevel","dryTime"]:
-                    if option_setting in timing_data[option]:
-                        timing = timing + int(timing_data[option][option_setting])
-                    else:
-                        timing = timing + int(timing_data[option]["default"])
-                elif option == "steamLevel":
-                    timing = timing + int(timing_data["steamLevel"]["+steamType"][option_setting])
-                else:
-                    for phase in timing_data[option]:
-                        if option_setting in timing_data[option][phase]:
-                            timing = timing + int(timing_data[option][phase][option_setting])
-                        else:
-                            _LOGGER.error("Missing timing value")
-                            _LOGGER.error(option)
-                            _LOGGER.error(option_setting)
-                            _LOGGER.error(timing_data[option])
         if timing//60 > 0:
             hours = timing//60
             minutes = timing%60
@@ -88,6 +79,11 @@ class HonDevice(HonBaseBinarySensor):
 
         attributes = {"mac": self._device._mac}
 
+        command_queue = self._device.command_queue
+        if command_queue.result is not None:
+            attributes["command_queue"] = command_queue.depth
+            attributes["last_command_result"] = command_queue.result
+
         if self._attr_is_on == False:
             self._attr_extra_state_attributes = attributes
             return
@@ -75,5 +75,9 @@ class HonPauseProgramButton(HonBaseEntity, ButtonEntity):
 
 
 class HonReloadProgramsButton(HonBaseEntity, ButtonEntity):
+    @property
+    def available(self) -> bool:
+        return True
+
     async def async_press(self) -> None:
         await self._device.get_programs()
\ No newline at end of file
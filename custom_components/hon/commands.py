@@ -0,0 +1,98 @@
+import logging
+import asyncio
+import random
+import time
+
+import aiohttp
+
+from .ratelimit import HonThrottledError
+
+_LOGGER = logging.getLogger(__name__)
+
+COMMAND_RETRIES = 3 # attempts after the first one
+COMMAND_BACKOFF = 2 # seconds, doubled at every retry
+COMMAND_BACKOFF_MAX = 30 # seconds
+COMMAND_DEDUP_WINDOW = 5 # seconds during which an identical successful command is not sent again
+COMMAND_CONCURRENCY = 4 # commands in flight per account
+
+
+class HonCommandError(Exception):
+    """Transient failure, the command can be sent again"""
+
+
+class HonCommandQueue:
+    """Serializes the commands of one appliance and collapses the duplicated ones"""
+    def __init__(self, device, semaphore) -> None:
+        self._device    = device
+        self._semaphore = semaphore
+        self._lock      = asyncio.Lock()
+        self._pending   = {} # command key: future shared by the identical calls
+        self._last      = (None, 0, False) # (command key, monotonic time, result)
+        self._result    = None # "success" or "failure" of the last command
+        self._generation = 0
+
+    @property
+    def depth(self):
+        return len(self._pending)
+
+    @property
+    def result(self):
+        return self._result
+
+    @property
+    def generation(self):
+        """Incremented every time the depth or the result changes"""
+        return self._generation
+
+    def _publish(self, result=None):
+        # Kept out of the appliance context, only the entities are redrawn
+        if result is not None:
+            self._result = result
+        self._generation += 1
+        self._device.update_entities()
+
+    async def async_send(self, key, send):
+        """Run send() once for every distinct key, returns its result"""
+        last_key, last_time, last_result = self._last
+        if key == last_key and last_result and time.monotonic() - last_time < COMMAND_DEDUP_WINDOW:
+            _LOGGER.debug("Command %s for mac[%s] already sent, ignored", key[0], self._device._mac)
+            return True
+
+        if key in self._pending:
+            _LOGGER.debug("Command %s for mac[%s] already queued, ignored", key[0], self._device._mac)
+            return await asyncio.shield(self._pending[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        self._publish()
+        result = False
+        try:
+            async with self._lock:
+                result = await self._async_send_with_retry(key[0], send)
+        finally:
+            del self._pending[key]
+            self._last = (key, time.monotonic(), result)
+            future.set_result(result)
+            self._publish("success" if result else "failure")
+        return result
+
+    async def _async_send_with_retry(self, command, send):
+        delay = COMMAND_BACKOFF
+        for attempt in range(COMMAND_RETRIES + 1):
+            try:
+                async with self._semaphore:
+                    return await send()
+            except HonThrottledError as err:
+                # Already retried by the API request after every 429
+                _LOGGER.error(f"Command {command} for mac[{self._device._mac}] throttled: {err}")
+                return False
+            except (HonCommandError, aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if attempt == COMMAND_RETRIES:
+                    _LOGGER.error(f"Command {command} for mac[{self._device._mac}] failed after {attempt + 1} attempts: {err}")
+                    return False
+                # Jitter keeps the retries of many appliances apart
+                wait = random.uniform(delay / 2, delay)
+                _LOGGER.warning(f"Command {command} for mac[{self._device._mac}] failed ({err}), retry in {wait:.1f}s")
+                await asyncio.sleep(wait)
+                delay = min(delay * 2, COMMAND_BACKOFF_MAX)
+        return False
@@ -7,7 +7,7 @@ from .hon import HonConnection
 from homeassistant import config_entries
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
 
-from .const import DOMAIN, CONF_ID_TOKEN, CONF_FRAMEWORK, CONF_COGNITO_TOKEN, CONF_REFRESH_TOKEN
+from .const import DOMAIN, CONF_ID_TOKEN, CONF_FRAMEWORK, CONF_COGNITO_TOKEN, CONF_REFRESH_TOKEN, CONF_TOKEN_EXPIRY
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,7 +16,7 @@ class HonFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow."""
 
     VERSION = 1
-    MINOR_VERSION = 3
+    MINOR_VERSION = 4
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
     def __init__(self):
@@ -56,7 +56,7 @@ class HonFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         self._abort_if_unique_id_configured()
 
         # Test connection
-        hon = HonConnection(None, None, self._email, self._password)
+        hon = HonConnection(self.hass, None, self._email, self._password)
         if( await hon.async_authorize() == False ):
             errors = {}
             errors["base"] = "auth_error"
@@ -69,10 +69,11 @@ class HonFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             data={
                 CONF_EMAIL: self._email,
                 CONF_PASSWORD: self._password,
-                CONF_ID_TOKEN: "",
+                CONF_ID_TOKEN: hon.id_token,
                 CONF_FRAMEWORK: "none",
-                CONF_COGNITO_TOKEN: "",
-                CONF_REFRESH_TOKEN: ""
+                CONF_COGNITO_TOKEN: hon.cognito_token,
+                CONF_REFRESH_TOKEN: hon.refresh_token,
+                CONF_TOKEN_EXPIRY: hon.token_expiry
             },
         )
 
@@ -8,10 +8,16 @@ DOMAIN = "hon"
 CONF_ID_TOKEN = "token"
 CONF_COGNITO_TOKEN = "cognito_token"
 CONF_REFRESH_TOKEN = "refresh_token"
+CONF_TOKEN_EXPIRY = "token_expiry"
 CONF_FRAMEWORK = "framework"
 CONF_MAC = "mac"
 CONF_DISABLED_PROGRAMS = "disabled_programs"
 CONF_SOFTENER_REMAINING_TIME = "softener_remaining_time"
+CONF_POLL_INTERVAL_RUNNING = "poll_interval_running"
+CONF_POLL_INTERVAL_ENDING = "poll_interval_ending"
+CONF_POLL_INTERVAL_IDLE = "poll_interval_idle"
+CONF_POLL_INTERVAL_OFFLINE = "poll_interval_offline"
+CONF_PUSH = "push"
 
 CONF_PROGRAMS = "programs"
 CONF_SETTINGS = "settings"
@@ -19,12 +25,15 @@ CONF_SETTINGS = "settings"
 CONF_CURRENT_PROGRAM = "current_program"
 CONF_PROGRAMS_SETTINGS = "programs_settings"
 CONF_GLOBAL_SETTINGS = "global_settings"
+CONF_DELAY_TIME = "delay_time"
+CONF_DELAY_ARMED = "delay_armed"
 
 PLATFORMS = [
     "select",
     "switch",
     "binary_sensor",
-    "button"
+    "button",
+    "sensor"
 ]
 
 SENSORS_DEFAULT = {
@@ -103,8 +112,60 @@ SENSORS_DEFAULT = {
     }
 }
 
+""" Context poll interval (seconds) by appliance state """
+POLL_INTERVAL_DEFAULT = {
+    CONF_POLL_INTERVAL_RUNNING: 30,
+    CONF_POLL_INTERVAL_ENDING: 10,
+    CONF_POLL_INTERVAL_IDLE: 120,
+    CONF_POLL_INTERVAL_OFFLINE: 300
+}
+POLL_ENDING_MINUTES = 5 # remainingTimeMM below which a cycle is considered ending
+POLL_INTERVAL_PUSH = 900 # safety resync while the push channel is up
+COMMAND_REFRESH_DELAY = 5 # seconds before the context is read back after a command
+COMMAND_EXPECTATION_TIMEOUT = 60 # seconds an unconfirmed optimistic value is kept at most
+
+""" Context keys behind HonDevice.is_on and is_running """
+DEVICE_STATE_KEYS = ["remoteCtrValid", "lastConnEvent", "machMode"]
+
+""" Context keys read by the integration, the others are dropped while parsing """
+CONTEXT_KEYS = DEVICE_STATE_KEYS + [
+    "prPhase",
+    "remainingTimeMM",
+    "delayTime",
+    "temp",
+    "spinSpeed",
+    "dryLevel",
+    "error",
+    "errors",
+    "detWarn",
+    "softWarn"
+]
+
+""" Raw values of a context parameter grouped by the value shown, by appliance type """
+CONTEXT_VALUE_MAPS = {
+    "prPhase": {
+        "WM": {
+            "0": ["0","10"], # Ready
+            "1": ["1","2","14","15","16","25","27"], # Wash
+            "3": ["3","11"], # Spin
+            "4": ["4","5","6","17","18"], # Rinse
+            "7": ["7","8"], # Drying
+            "12": ["12","13"] # Weighing
+        },
+        "TD": {
+            "0": ["0","11"], # Ready
+            "1": ["1","2","14","15","19","20"], # Drying
+            "3": ["3","13","16"], # Cooldown
+            "8": ["8","12","17"] # Unknown
+        }
+    }
+}
+
 AUTH_API        = "https://account2.hon-smarthome.com/SmartHome"
 API_URL         = "https://api-iot.he.services"
+CLIENT_ID       = "3MVG9QDx8IX8nP5T2Ha8ofvlmjLZl5L_gvfbT9.HJvpHGKoAS_dcMN8LYpTSYeVFCraUnV.2Ag1Ki7m4znVO6"
+AWS_ENDPOINT    = "a30f6tqw0oh1x0-ats.iot.eu-west-1.amazonaws.com"
+AWS_AUTHORIZER  = "candy-iot-authorizer"
 APP_VERSION     = "2.10.6"
 OS_VERSION      = "15.7.1"
 OS              = "ios"
@@ -1,38 +1,54 @@
 import logging
+import time
 from copy import deepcopy
-import os
-import json
+from types import MappingProxyType
 
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.event import async_call_later
 from homeassistant.components.notify import (
     ATTR_MESSAGE,
     ATTR_TITLE,
     SERVICE_PERSISTENT_NOTIFICATION,
 )
 from homeassistant.components.notify import DOMAIN as NOTIFICATION_DOMAIN
-from deep_translator import GoogleTranslator
 
 from .const import (
     DOMAIN,
     APPLIANCE_DEFAULT_NAME,
     CONF_MAC,
     CONF_SOFTENER_REMAINING_TIME,
+    CONF_POLL_INTERVAL_RUNNING,
+    CONF_POLL_INTERVAL_ENDING,
+    CONF_POLL_INTERVAL_IDLE,
+    CONF_POLL_INTERVAL_OFFLINE,
+    POLL_INTERVAL_DEFAULT,
+    POLL_ENDING_MINUTES,
+    POLL_INTERVAL_PUSH,
+    COMMAND_REFRESH_DELAY,
+    COMMAND_EXPECTATION_TIMEOUT,
     CONF_PROGRAMS,
     CONF_SETTINGS,
     CONF_CURRENT_PROGRAM,
     CONF_PROGRAMS_SETTINGS,
-    CONF_GLOBAL_SETTINGS
+    CONF_GLOBAL_SETTINGS,
+    CONF_DELAY_TIME,
+    CONF_DELAY_ARMED
 )
+from .translator import get_translator
+from .parser import HonContextParser
+from .scheduler import HonDelayScheduler
+from .storage import get_catalog_key, get_catalog_storage
 
 _LOGGER = logging.getLogger(__name__)
 
 class HonDevice(CoordinatorEntity):
-    def __init__(self, entry, hon, coordinator, appliance, translations) -> None:
+    def __init__(self, entry, hon, coordinator, appliance, translations, storage) -> None:
         super().__init__(coordinator)
 
         self._translations  = translations
         self._entry         = entry
         self._hon           = hon
+        self._storage       = storage
         self._coordinator   = coordinator
         self._hass          = self._coordinator.hass
         self._appliance     = appliance
@@ -47,15 +63,64 @@ class HonDevice(CoordinatorEntity):
         self._serial_number = appliance["serialNumber"]
         self._fw_version    = appliance["fwVersion"]
         self._mac_address   = appliance["macAddress"]
+        self._catalog_key   = get_catalog_key(appliance)
+        self._parser        = HonContextParser(self._type_name)
 
         self._attributes = {}
-        self._delay_time = None
+        self._duration_cache = (None, None, None) # (index, option values, minutes)
+        self._delay_time = self.get_storage_data(CONF_DELAY_TIME)
         self._manually_detergent_notify = False
         self._manually_softener_notify = False
         self._low_detergent_notify = False
         self._low_softener_notify = False
+        self._ready = False
+        self._push_active = False
 
-        self._cache = {}
+        # Read-only merge of stored catalog and user overrides, rebuilt on change
+        self._view = None
+        self._view_catalog = None
+        self._generation = 0
+
+        # Context generation of the last change of each key
+        self._data_generation = 0
+        self._data_changes = {}
+
+        # Optimistic values set after a command {key: (value, deadline)}
+        self._expectations = {}
+        self._unsub_reconcile = None
+        self._reconcile_delay = COMMAND_REFRESH_DELAY
+
+        self._delay_scheduler = HonDelayScheduler(self._hass, self._on_delay_step)
+
+    def set_delay_time(self, value):
+        self._delay_time = value
+        self.set_storage_data(CONF_DELAY_TIME, value)
+        if self._delay_scheduler.armed:
+            self._delay_scheduler.arm(value)
+        self.invalidate_view()
+
+    @property
+    def delay_armed(self):
+        return self._delay_scheduler.armed
+
+    def arm_delay(self):
+        """Delay the start so that the program ends at the selected time"""
+        if not self._delay_time:
+            return
+        self._delay_scheduler.arm(self._delay_time)
+        self.set_storage_data(CONF_DELAY_ARMED, True)
+        self.invalidate_view()
+        self.update_entities()
+
+    def disarm_delay(self):
+        self._delay_scheduler.disarm()
+        self.set_storage_data(CONF_DELAY_ARMED, False)
+        self.invalidate_view()
+        self.update_entities()
+
+    def _on_delay_step(self):
+        self.invalidate_view()
+        self.update_entities()
 
     def get_yaml_config(self, key):
         yaml = self._hass.data[DOMAIN]["configuration_yaml"]
@@ -67,67 +132,90 @@ class HonDevice(CoordinatorEntity):
         return None
 
     def set_storage_data(self, key: str, value):
-        hass_config_path = self._hass.config.path()
-        storage_path = os.path.join(hass_config_path, ".storage", DOMAIN)
-        if not os.path.isdir(storage_path):
-            os.mkdir(storage_path)
-        data_path = os.path.join(storage_path, f"{self._mac}_{key}.json")
-        if os.path.isfile(data_path):
-            os.remove(data_path)
-        with open(data_path, 'w', encoding='utf-8') as f:
-            json.dump(value, f, ensure_ascii=False, indent=4)
-        del self._cache[key]
+        if self._storage.get(self._mac, key) == value:
+            return
+        self._storage.set(self._mac, key, value)
+        self.invalidate_view()
 
     def get_storage_data(self, key: str):
-        if key in self._cache and self._cache[key]:
-            return self._cache[key]
-        hass_config_path = self._hass.config.path()
-        storage_path = os.path.join(hass_config_path, ".storage", DOMAIN)
-        data_path = os.path.join(storage_path, f"{self._mac}_{key}.json")
-        value = None
-        if os.path.isdir(storage_path) and os.path.isfile(data_path):
-            with open(data_path) as f:
-                value = json.load(f)
-        self._cache[key] = value
-        return value
-
-    def copy_dict(self, data):
-        new_data = {}
-        for data_key in data:
-            if isinstance(data[data_key], dict):
-                new_data[data_key] = self.copy_dict(data[data_key])
-            else:
-                new_data[data_key] = deepcopy(data[data_key])
-        return new_data
+        return self._storage.get(self._mac, key)
+
+    @property
+    def catalog(self):
+        """Programs and settings shared with the appliances of the same model"""
+        return get_catalog_storage(self._hass).get(self._catalog_key)
 
-    def get_entry_data(self):
-        return self.copy_dict(self._entry.data)
+    def set_catalog(self, programs, settings):
+        get_catalog_storage(self._hass).set(self._catalog_key, {CONF_PROGRAMS: programs, CONF_SETTINGS: settings})
+        self.invalidate_view()
 
     def get_config_data(self, key):
-        data = self.get_entry_data()
-        if self._mac not in data or key not in data[self._mac]:
-            return {}
-        return data[self._mac][key]
+        """Copy of a stored override dict, safe to modify before set_stored_data"""
+        return deepcopy(self.get_storage_data(key) or {})
 
     def set_stored_data(self, key, value):
-        data = self.get_entry_data()
-        if self._mac not in data:
-            data[self._mac] = {}
-        if key not in data[self._mac]:
-            data[self._mac][key] = {}
-        data[self._mac][key] = value
-        self._hass.config_entries.async_update_entry(self._entry, data=data)
-        # self._hass.config_entries._async_schedule_save()
-        # self._coordinator.async_update_listeners()
+        # Kept in the account storage, written once the burst of changes is over
+        self.set_storage_data(key, value)
 
     @property
-    def settings(self):
-        settings = self.get_storage_data(CONF_SETTINGS)
-        stored_settings = self.get_config_data(CONF_GLOBAL_SETTINGS)
+    def generation(self):
+        """Incremented every time programs, settings or overrides change"""
+        return self._generation
+
+    def invalidate_view(self):
+        self._view = None
+        self._generation += 1
+
+    def build_view(self):
+        catalog = self.catalog or {}
+
+        settings = deepcopy(catalog.get(CONF_SETTINGS) or {})
+        stored_settings = self.get_storage_data(CONF_GLOBAL_SETTINGS) or {}
         for setting in stored_settings:
             if setting in settings:
                 settings[setting]["value"] = stored_settings[setting]
-        return settings
+
+        programs = deepcopy(catalog.get(CONF_PROGRAMS) or {})
+        stored_programs = self.get_storage_data(CONF_PROGRAMS_SETTINGS) or {}
+        for program in stored_programs:
+            for param in stored_programs[program]:
+                if program in programs and param in programs[program]["params"]:
+                    programs[program]["params"][param]["value"] = stored_programs[program][param]
+
+        current_program = self.get_storage_data(CONF_CURRENT_PROGRAM) or None
+
+        params = {}
+        if current_program in programs:
+            params = {**programs[current_program]["params"]}
+            for param in params:
+                if param in ["delayTime", "lang", "waterHard"] and param in settings:
+                    params[param] = settings[param]
+            if "delayTime" in params:
+                # Computed from the target end time, never stored
+                params["delayTime"] = {**params["delayTime"], "value": str(self._delay_scheduler.get_delay())}
+
+        return {
+            CONF_SETTINGS: MappingProxyType(settings),
+            CONF_PROGRAMS: MappingProxyType(programs),
+            CONF_CURRENT_PROGRAM: current_program,
+            "current_program_params": MappingProxyType(params),
+        }
+
+    @property
+    def view(self):
+        """Shared read-only view, callers must never mutate it"""
+        catalog = self.catalog
+        if self._view is not None and catalog is not self._view_catalog:
+            # Catalog replaced by an appliance of the same model
+            self.invalidate_view()
+        if self._view is None:
+            self._view = self.build_view()
+            self._view_catalog = catalog
+        return self._view
+
+    @property
+    def settings(self):
+        return self.view[CONF_SETTINGS]
 
     def get_setting(self, key):
         if key not in self.settings:
@@ -143,19 +231,24 @@ class HonDevice(CoordinatorEntity):
 
     @property
     def programs(self):
-        programs = self.get_storage_data(CONF_PROGRAMS)
-        stored_programs = self.get_config_data(CONF_PROGRAMS_SETTINGS)
-        for program in stored_programs:
-            for param in stored_programs[program]:
-                if program in programs and param in programs[program]["params"]:
-                    programs[program]["params"][param]["value"] = stored_programs[program][param]
-        return programs
+        return self.view[CONF_PROGRAMS]
 
     def get_program(self, key):
         if key not in self.programs:
             return None
         return self.programs[key]
 
+    def get_program_duration(self, key):
+        """Minutes of a program with its current option values, None without timing"""
+        duration = get_catalog_storage(self._hass).get_durations(self._catalog_key).get(key)
+        if duration is None or key not in self.programs:
+            return None
+        params = self.current_program_params if key == self.current_program_name else self.programs[key]["params"]
+        values = tuple((option, params[option].get("value") if option in params else None) for option in duration.options)
+        if self._duration_cache[:2] != (duration, values):
+            self._duration_cache = (duration, values, duration.get_duration(dict(values)))
+        return self._duration_cache[2]
+
     def get_program_params(self, key):
         data = self.get_program(key)
         if data == None:
@@ -172,45 +265,38 @@ class HonDevice(CoordinatorEntity):
     def update_program_params(self, name, key, value):
         if name not in self.programs or key not in self.programs[name]["params"]:
             return
-        data = {}
-        if name in self.get_config_data(CONF_PROGRAMS_SETTINGS):
-            data = self.get_config_data(CONF_PROGRAMS_SETTINGS)[name]
+        data = self.get_config_data(CONF_PROGRAMS_SETTINGS).get(name, {})
         data[key] = value
         self.update_program(name, data)
 
     @property
     def current_program_name(self):
-        result = None
-        if self.get_config_data(CONF_CURRENT_PROGRAM):
-            result = self.get_config_data(CONF_CURRENT_PROGRAM)
-        return result
+        return self.view[CONF_CURRENT_PROGRAM]
 
     def set_current_program(self, name):
         self.set_stored_data(CONF_CURRENT_PROGRAM, name)
+        self.update_entities()
 
     @property
     def current_program_params(self):
-        if not self.current_program_name:
-            return {}
-        params = {**self.get_program_params(self.current_program_name)}
-        for param in params:
-            if param in ["delayTime", "lang", "waterHard"]:
-                setting = self.get_setting(param)
-                if setting != None:
-                    params[param] = setting
-        return params
+        return self.view["current_program_params"]
 
     def get_current_program_param(self, key):
-        data = self.current_program_params
-        if key not in data:
-            return None
-        return data[key]
+        return self.current_program_params.get(key)
 
     def set_current_program_param(self, key, value):
         if key in ["delayTime", "lang", "waterHard"]:
             self.update_setting(key, value)
         else:
             self.update_program_params(self.current_program_name, key, value)
+        self.update_entities()
+
+    @property
+    def command_queue(self):
+        return self._hon.get_command_queue(self)
+
+    def update_entities(self):
+        """Recompute the entities from the in-memory catalog and context, no network I/O"""
         self._coordinator.async_update_listeners()
 
     @property
@@ -223,34 +309,29 @@ class HonDevice(CoordinatorEntity):
         return settings
 
     @property
-    def all_params(self):
-        params = {}
-        for program_name in self.programs:
-            params[program_name] = self.programs[program_name]["params"]
-        return params
-
-    @property
-    def sensors(self):
-        sensors = {"switch": [], "select": []}
-        for program_name in self.all_params:
-            program_options = self.all_params[program_name]
-            for option_name in program_options:
-                option = program_options[option_name]
-                if ("type" in option) and (not option_name in sensors[option["type"]]):
-                    sensors[option["type"]].append(option_name)
-        for setting in self.settings:
-            option = self.settings[setting]
-            if "type" in option:
-                sensors[option["type"]].append(setting)
-        return sensors
+    def entity_index(self):
+        return get_catalog_storage(self._hass).get_entity_index(self._catalog_key)
 
     @property
     def is_on(self):
         return self.get_data("remoteCtrValid") == "1" and self.get_data("lastConnEvent") == "CONNECTED"
 
+    @property
+    def is_ready(self):
+        """Context and program catalog have been loaded at least once"""
+        return self._ready
+
+    def set_ready(self):
+        self._ready = True
+        if self.get_storage_data(CONF_DELAY_ARMED) and self._delay_time and not self._delay_scheduler.armed:
+            # Armed before a restart or a reload of the entry
+            self._delay_scheduler.arm(self._delay_time)
+            self.invalidate_view()
+        self._coordinator.async_update_listeners()
+
     @property
     def is_available(self):
-        return self.is_on
+        return self._ready and self.is_on
 
     @property
     def is_running(self):
@@ -258,14 +339,59 @@ class HonDevice(CoordinatorEntity):
             return True
         return False
 
+    def get_poll_interval(self, key):
+        value = self.get_yaml_config(key)
+        if value:
+            return value
+        return POLL_INTERVAL_DEFAULT[key]
+
+    def set_push_active(self, active):
+        if self._push_active == active:
+            return
+        self._push_active = active
+        self._hon.async_schedule_poll()
+
+    @property
+    def poll_interval(self):
+        """Seconds until the next context poll, based on the last known state"""
+        if self._push_active:
+            return POLL_INTERVAL_PUSH
+        last_conn_event = self.get_data("lastConnEvent")
+        if last_conn_event is not None and last_conn_event != "CONNECTED":
+            return self.get_poll_interval(CONF_POLL_INTERVAL_OFFLINE)
+        if self.get_data("machMode") is None or self.is_running:
+            remaining = self.get_data("remainingTimeMM")
+            if self.get_data("machMode") == "2" and remaining and int(remaining) <= POLL_ENDING_MINUTES:
+                return self.get_poll_interval(CONF_POLL_INTERVAL_ENDING)
+            return self.get_poll_interval(CONF_POLL_INTERVAL_RUNNING)
+        return self.get_poll_interval(CONF_POLL_INTERVAL_IDLE)
+
     def get_data(self, key):
         if key in self._attributes:
             return self._attributes[key]
         return None
 
+    @property
+    def data_generation(self):
+        """Incremented every time a context value changes"""
+        return self._data_generation
+
+    def changed_since(self, keys, generation):
+        if keys is None:
+            return self._data_generation > generation
+        return any(self._data_changes.get(key, 0) > generation for key in keys)
+
     def set_data(self, data):
-        for key in data:
+        poll_interval = self.poll_interval
+        changed = [key for key in data if key not in self._attributes or self._attributes[key] != data[key]]
+        if not changed:
+            return
+        self._data_generation += 1
+        for key in changed:
             self._attributes[key] = data[key]
+            self._data_changes[key] = self._data_generation
+        if self.poll_interval != poll_interval:
+            self._hon.async_schedule_poll()
         self._coordinator.async_update_listeners()
 
     async def send_notify(self, message):
@@ -273,11 +399,6 @@ class HonDevice(CoordinatorEntity):
         data[ATTR_MESSAGE] = message
         await self._hass.services.async_call(NOTIFICATION_DOMAIN, SERVICE_PERSISTENT_NOTIFICATION, data)
 
-    async def get_translation(self, string):
-        translator = GoogleTranslator(source='auto', target='it')
-        translated = await self._hass.async_add_executor_job(translator.translate, string)
-        return translated
-
     def get_param_config(self, param, configs, stored_configs = None):
         result = {}
         default_value = None
@@ -299,76 +420,130 @@ class HonDevice(CoordinatorEntity):
             result["value"] = 0
         return result
 
-    async def get_programs(self):
+    async def load_catalog(self):
+        catalog = self.catalog
+        if catalog and catalog[CONF_PROGRAMS] and catalog[CONF_SETTINGS]:
+            return True
+
+        # Catalog stored per appliance by the previous versions
         programs = self.get_storage_data(CONF_PROGRAMS)
         settings = self.get_storage_data(CONF_SETTINGS)
-        if not programs or not settings:
-            commands = await self._hon.get_programs(self._appliance)
-            if "startProgram" not in commands:
-                return
-            programs = {}
-            settings = {}
-            for program in commands["startProgram"]:
-                program_attr = commands["startProgram"][program]
-                program_name = program.split(".")[-1].lower()
-                if program_name.endswith("_steam") or program_name.find("_dash_") != -1:
+        if programs and settings:
+            self.set_catalog(programs, settings)
+            self._storage.remove(self._mac, CONF_PROGRAMS)
+            self._storage.remove(self._mac, CONF_SETTINGS)
+            return True
+
+        commands = await self._hon.get_programs(self._appliance)
+        if "startProgram" not in commands:
+            return False
+        programs = {}
+        settings = {}
+        for program in commands["startProgram"]:
+            program_attr = commands["startProgram"][program]
+            program_name = program.split(".")[-1].lower()
+            if program_name.endswith("_steam") or program_name.find("_dash_") != -1:
+                continue
+            program_params = {}
+            for param in program_attr["parameters"]:
+                configs = program_attr["parameters"][param]
+                if (param in ["delayTime", "lang", "waterHard"]):
+                    if param not in settings:
+                        settings[param] = self.get_param_config(param, configs)
+                    program_params[param] = {}
                     continue
-                program_params = {}
-                for param in program_attr["parameters"]:
-                    configs = program_attr["parameters"][param]
-                    if (param in ["delayTime", "lang", "waterHard"]):
-                        if param not in settings:
-                            settings[param] = self.get_param_config(param, configs)
-                        program_params[param] = {}
-                        continue
-                    program_params[param] = self.get_param_config(param, configs)
-                description = await self.get_translation(program_attr["description"])
-                program_data = {"info": description, "params": program_params}
-                if "remainingTimes" in program_attr:
-                    program_data["timing"] = program_attr["remainingTimes"]
-                programs[program_name] = program_data
-            self.set_storage_data("programs", programs)
-            self.set_storage_data("settings", settings)
-
-        current_program = list(programs)[0]
+                program_params[param] = self.get_param_config(param, configs)
+            program_data = {"info": program_attr["description"], "params": program_params}
+            if "remainingTimes" in program_attr:
+                program_data["timing"] = program_attr["remainingTimes"]
+            programs[program_name] = program_data
+        descriptions = await get_translator(self._hass).async_translate([programs[name]["info"] for name in programs])
+        for name, description in zip(programs, descriptions):
+            programs[name]["info"] = description
+        self.set_catalog(programs, settings)
+        return True
+
+    async def get_programs(self):
+        # Identical appliances wait for the first one and reuse its catalog
+        async with get_catalog_storage(self._hass).lock(self._catalog_key):
+            if not await self.load_catalog():
+                return
+
+        current_program = list(self.programs)[0]
         if self.current_program_name:
             current_program = self.current_program_name
         self.set_current_program(current_program)
 
     async def get_context(self):
         data = await self._hon.get_context(self)
-
-        attributes = {}
-
-        for name, values in data.pop("shadow", {'NA': 0}).get("parameters").items():
-            attributes[name] = values["parNewVal"]
-
-            if name == "prPhase":
-                if self._type_name.upper() == "WM":
-                    if attributes[name] in ["0","10"]: # Ready
-                        attributes[name] = "0"
-                    if attributes[name] in ["1","2","14","15","16","25","27"]: # Wash
-                        attributes[name] = "1"
-                    if attributes[name] in ["3","11"]: # Spin
-                        attributes[name] = "3"
-                    if attributes[name] in ["4","5","6","17","18"]: # Rinse
-                        attributes[name] = "4"
-                    if attributes[name] in ["7","8"]: # Drying
-                        attributes[name] = "7"
-                    if attributes[name] in ["12","13"]: # Weighing
-                        attributes[name] = "12"
-                if self._type_name.upper() == "TD":
-                    if attributes[name] in ["0","11"]: # Ready
-                        attributes[name] = "0"
-                    if attributes[name] in ["1","2","14","15","19","20"]: # Drying
-                        attributes[name] = "1"
-                    if attributes[name] in ["3","13","16"]: # Cooldown
-                        attributes[name] = "3"
-                    if attributes[name] in ["8","12","17"]: # Unknown
-                        attributes[name] = "8"
-
-        attributes["lastConnEvent"] = data["lastConnEvent"]["category"]
-
+        await self.process_context(data)
+
+    async def process_context(self, data):
+        await self.apply_attributes(self._parser.parse_context(data))
+
+    async def process_push(self, parameters):
+        """Apply the parameters received from the push channel"""
+        attributes = {**self._attributes, **self._parser.parse_parameters(parameters)}
+        await self.apply_attributes(attributes)
+
+    async def async_shutdown(self):
+        """Cancel the delay and reconcile timers, the device is not used after an unload"""
+        self._delay_scheduler.disarm()
+        if self._unsub_reconcile is not None:
+            self._unsub_reconcile()
+            self._unsub_reconcile = None
+        self._expectations = {}
+
+    def expect(self, data):
+        """Optimistic values of a command, read back until the appliance confirms them or the deadline passes"""
+        deadline = time.monotonic() + COMMAND_EXPECTATION_TIMEOUT
+        for key in data:
+            self._expectations[key] = (data[key], deadline)
+        self.set_data(data)
+        self._schedule_reconcile(COMMAND_REFRESH_DELAY)
+
+    def _schedule_reconcile(self, delay):
+        if self._unsub_reconcile is not None:
+            self._unsub_reconcile()
+        self._reconcile_delay = delay
+        self._unsub_reconcile = async_call_later(self._hass, delay, self._async_reconcile)
+
+    async def _async_reconcile(self, now=None):
+        self._unsub_reconcile = None
+        await self._coordinator.async_refresh()
+        if not self._expectations:
+            return
+        # The shadow of the appliance can lag behind, read back again with backoff
+        remaining = max(deadline for value, deadline in self._expectations.values()) - time.monotonic()
+        if remaining > 0:
+            # Last read back just past the deadline, when the rollback applies
+            self._schedule_reconcile(min(self._reconcile_delay * 2, remaining + 1))
+        else:
+            # Keys missing from the context, nothing to roll back to
+            self._expectations = {}
+
+    def reconcile(self, attributes):
+        """Keep the optimistic values over the contexts until they match or the deadline passes"""
+        now = time.monotonic()
+        for key in list(self._expectations):
+            if key not in attributes:
+                continue
+            value, deadline = self._expectations[key]
+            if attributes[key] == value:
+                del self._expectations[key]
+            elif now >= deadline:
+                _LOGGER.debug("Optimistic %s=%s of mac[%s] rolled back to %s", key, value, self._mac, attributes[key])
+                del self._expectations[key]
+            else:
+                attributes[key] = value
+        if not self._expectations and self._unsub_reconcile is not None:
+            # Confirmed by a regular poll or push, no read back needed
+            self._unsub_reconcile()
+            self._unsub_reconcile = None
+        return attributes
+
+    async def apply_attributes(self, attributes):
+        attributes = self.reconcile(attributes)
         if "machMode" in attributes and int(attributes["machMode"]) == 7 and self.get_data("machMode") != None and int(self.get_data("machMode")) == 2:
             await self.send_notify(self._translations.get("component.hon.entity.binary_sensor.notify.state.finished", "finished"))
             self._manually_detergent_notify = False
@@ -386,6 +561,10 @@ class HonDevice(CoordinatorEntity):
         self.set_data(attributes)
 
     async def send_start(self):
+        if self._delay_scheduler.armed:
+            # Delay from the current time, the view may be up to one step old
+            self.invalidate_view()
+
         if (not self.current_program_name) or (not self.current_program_settings):
             return
 
@@ -420,13 +599,13 @@ class HonDevice(CoordinatorEntity):
             new_mode = "2"
             if int(self.current_program_settings["delayTime"]) > 0:
                 new_mode = "4"
-            self.set_data({"machMode": new_mode})
+            self.expect({"machMode": new_mode})
 
 
     async def send_stop(self):
         result = await self._hon.send_command(self, "stopProgram", {"onOffStatus": "0"})
         if result:
-            self.set_data({"machMode": "1"})
+            self.expect({"machMode": "1"})
             self._manually_detergent_notify = False
             self._manually_softener_notify = False
 
@@ -447,4 +626,4 @@ class HonDevice(CoordinatorEntity):
 
         result = await self._hon.send_command(self, command, {"pause": pause})
         if result:
-            self.set_data({"machMode": new_mode})
+            self.expect({"machMode": new_mode})
@@ -0,0 +1,35 @@
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+
+from .const import DOMAIN, CONF_ID_TOKEN, CONF_COGNITO_TOKEN, CONF_REFRESH_TOKEN
+from .ratelimit import get_rate_limiter
+
+TO_REDACT = [CONF_EMAIL, CONF_PASSWORD, CONF_ID_TOKEN, CONF_COGNITO_TOKEN, CONF_REFRESH_TOKEN, "macAddress", "serialNumber", "topics"]
+
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    hon = hass.data[DOMAIN][entry.unique_id]
+
+    appliances = []
+    for appliance in hon.appliances:
+        coordinator = await hon.async_get_coordinator(appliance)
+        device = coordinator.device
+        data = {"appliance": async_redact_data(appliance, TO_REDACT)}
+        if device is not None:
+            data.update({
+                "ready": device.is_ready,
+                "available": device.is_available,
+                "poll_interval": device.poll_interval,
+                "push_active": device._push_active,
+                "programs": len(device.programs),
+                "context": device._attributes,
+            })
+        appliances.append(data)
+
+    return {
+        "entry": async_redact_data(entry.data, TO_REDACT),
+        "token_expiry": hon.token_expiry,
+        "metrics": hon.metrics.as_dict(),
+        "rate_limiter": get_rate_limiter(hass).as_dict(),
+        "appliances": appliances,
+    }
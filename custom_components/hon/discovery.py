@@ -0,0 +1,34 @@
+from .const import CONF_PROGRAMS, CONF_SETTINGS
+
+ENTITY_TYPES = ["switch", "select"]
+
+
+def compile_entity_index(catalog):
+    """{type: {key: {"programs": [...], "options": [...], "setting": bool}}} in discovery order"""
+    index = {entity_type: {} for entity_type in ENTITY_TYPES}
+    programs = catalog.get(CONF_PROGRAMS) or {}
+    for program_name in programs:
+        params = programs[program_name]["params"]
+        for key in params:
+            _add(index, key, params[key], program_name)
+
+    settings = catalog.get(CONF_SETTINGS) or {}
+    for key in settings:
+        _add(index, key, settings[key], None)
+
+    for entity_type in index:
+        for info in index[entity_type].values():
+            info["options"] = list(info["options"])
+    return index
+
+
+def _add(index, key, option, program_name):
+    if option.get("type") not in index:
+        return
+    info = index[option["type"]].setdefault(key, {"programs": [], "options": {}, "setting": False})
+    if program_name is None:
+        info["setting"] = True
+    else:
+        info["programs"].append(program_name)
+    for value in option.get("options", []):
+        info["options"][value] = None
@@ -0,0 +1,52 @@
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+""" Options whose timing is {value: minutes, "default": minutes} instead of {phase: {value: minutes}} """
+FLAT_TIMING_OPTIONS = ["dirtyLevel", "dryLevel", "dryTime"]
+
+
+class HonProgramDuration:
+    """Remaining times of a program flattened to {option: {value: minutes}}"""
+    def __init__(self, timing) -> None:
+        self._tables = {}
+        self._defaults = {}
+        for option in timing:
+            try:
+                self._compile_option(option, timing[option])
+            except (TypeError, ValueError, KeyError, AttributeError) as err:
+                _LOGGER.warning(f"Invalid timing of option [{option}]: {err}")
+
+    def _compile_option(self, option, option_timing):
+        if option in FLAT_TIMING_OPTIONS:
+            self._tables[option] = {str(value): int(option_timing[value]) for value in option_timing if value != "default"}
+            self._defaults[option] = int(option_timing.get("default", 0))
+        elif option == "steamLevel":
+            steam_timing = option_timing["+steamType"]
+            self._tables[option] = {str(value): int(steam_timing[value]) for value in steam_timing}
+            self._defaults[option] = 0
+        else:
+            # Sum of the phases, a value missing from a phase adds nothing for it
+            table = {}
+            for phase in option_timing:
+                for value in option_timing[phase]:
+                    table[str(value)] = table.get(str(value), 0) + int(option_timing[phase][value])
+            self._tables[option] = table
+            self._defaults[option] = 0
+
+    @property
+    def options(self):
+        return self._tables.keys()
+
+    def get_duration(self, values):
+        """Minutes for the {option: value} settings, options without a value are skipped"""
+        duration = 0
+        for option in self._tables:
+            value = values.get(option)
+            if value is not None:
+                duration += self._tables[option].get(str(value), self._defaults[option])
+        return duration
+
+
+def compile_program_durations(programs):
+    return {name: HonProgramDuration(programs[name]["timing"]) for name in programs if "timing" in programs[name]}
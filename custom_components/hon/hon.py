@@ -1,4 +1,5 @@
 import logging
+import asyncio
 import aiohttp
 import secrets
 import json
@@ -7,15 +8,36 @@ import time
 from urllib import parse
 from datetime import datetime
 
-from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import UpdateFailed
 
 from .base import HonBaseCoordinator
+from .commands import HonCommandQueue, HonCommandError, COMMAND_CONCURRENCY
+from .metrics import HonMetrics, get_endpoint_name
+from .logs import log_payload
+from .recorder import HonRecorder
+from .storage import get_catalog_key, get_catalog_storage
+from .ratelimit import (
+    get_rate_limiter,
+    get_retry_after,
+    HonThrottledError,
+    PRIORITY_COMMAND,
+    PRIORITY_CATALOG,
+    PRIORITY_POLL,
+    THROTTLE_RETRIES
+)
+from .utils import get_token_expiry
 from .const import (
     CONF_ID_TOKEN,
     CONF_FRAMEWORK,
     CONF_COGNITO_TOKEN,
     CONF_REFRESH_TOKEN,
+    CONF_TOKEN_EXPIRY,
+    DOMAIN,
     AUTH_API,
+    CLIENT_ID,
     API_URL,
     DEVICE_MODEL,
     APP_VERSION,
@@ -25,10 +47,50 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
-SESSION_TIMEOUT = 21600 # 6 hours session
+SESSION_TIMEOUT = 21600 # 6 hours session, used when the token expiry is unknown
+TOKEN_EXPIRY_MARGIN = 300 # seconds before the expiry when tokens are renewed
+REAUTH_COOLDOWN = 60 # seconds after a failed renewal before another login is attempted
+CONTEXT_POLL_CONCURRENCY = 4 # context requests in flight per account
+CONTEXT_POLL_ALIGN_WINDOW = 5 # seconds, appliances due within the window join the current cycle
+CONTEXT_POLL_MIN_DELAY = 1 # seconds between two poll cycles
+CONNECTION_LIMIT_PER_HOST = 8 # covers the context polls, bootstrap and commands in flight
+CONNECTION_KEEPALIVE = 75 # seconds, outlives the 30s poll of a running appliance
+DNS_CACHE_TTL = 300 # seconds
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10)
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.0.0 Safari/537.36"
+
+
+def get_connector(hass):
+    """Connection pool shared by all the accounts and the config flow"""
+    data = hass.data.setdefault(DOMAIN, {})
+    if "connector" not in data or data["connector"].closed:
+        connector = aiohttp.TCPConnector(
+            limit_per_host=CONNECTION_LIMIT_PER_HOST,
+            keepalive_timeout=CONNECTION_KEEPALIVE,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            enable_cleanup_closed=True,
+        )
+
+        async def async_close_connector(event):
+            await connector.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, async_close_connector)
+        data["connector"] = connector
+    return data["connector"]
+
+
+def create_session(hass):
+    """Session on the shared pool with its own cookie jar, the login flow relies on cookies"""
+    return aiohttp.ClientSession(
+        connector=get_connector(hass),
+        connector_owner=False,
+        cookie_jar=aiohttp.CookieJar(),
+        headers={"User-Agent": USER_AGENT},
+        timeout=REQUEST_TIMEOUT,
+    )
 
 class HonConnection:
-    def __init__(self, hass, entry, email = None, password = None) -> None:
+    def __init__(self, hass, entry, email = None, password = None, session = None) -> None:
         self._hass = hass
         self._entry = entry
         self._coordinator_dict  = {}
@@ -39,6 +101,10 @@ class HonConnection:
             self._email = email
             self._password = password
             self._framework = "None"
+            self._id_token = ""
+            self._refresh_token = ""
+            self._cognitoToken = ""
+            self._token_expiry = 0
         else:
             self._email = entry.data[CONF_EMAIL]
             self._password = entry.data[CONF_PASSWORD]
@@ -46,15 +112,28 @@ class HonConnection:
             self._id_token = entry.data.get(CONF_ID_TOKEN, "")
             self._refresh_token = entry.data.get(CONF_REFRESH_TOKEN, "")
             self._cognitoToken = entry.data.get(CONF_COGNITO_TOKEN, "")
+            self._token_expiry = entry.data.get(CONF_TOKEN_EXPIRY, 0)
 
         self._frontdoor_url = ""
-        self._start_time    = time.time()
 
-        self._header = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.0.0 Safari/537.36"
-        }
-        self._session = aiohttp.ClientSession(headers=self._header)
+        # An injected session is owned by the caller
+        self._session_owner = session is None
+        self._session = session or create_session(hass)
         self._appliances = []
+        self._unsub_poll = None
+        self._polling = False
+        self.push = None
+        self.storage = None
+        self.recorder = None
+        self._poll_lock = asyncio.Lock()
+        self._auth_lock = asyncio.Lock()
+        self._auth_attempt = 0 # renewals attempted, waiters share the outcome of the one they waited for
+        self._auth_result = False
+        self._auth_retry_at = 0 # monotonic time before which a failed renewal is not attempted again
+        self._command_queues = {}
+        self.metrics = HonMetrics()
+        self._limiter = get_rate_limiter(hass)
+        self._command_semaphore = asyncio.Semaphore(COMMAND_CONCURRENCY)
 
     @property
     def _headers(self):
@@ -64,13 +143,113 @@ class HonConnection:
             "id-token": self._id_token,
         }
 
+    @property
+    def devices(self):
+        return [coordinator.device for coordinator in self._coordinator_dict.values() if coordinator.device is not None]
+
     @property
     def appliances(self):
         return self._appliances
 
+    @property
+    def id_token(self):
+        return self._id_token
+
+    @property
+    def mobile_id(self):
+        return self._mobile_id
+
+    @property
+    def cognito_token(self):
+        return self._cognitoToken
+
+    @property
+    def refresh_token(self):
+        return self._refresh_token
+
+    @property
+    def token_expiry(self):
+        return self._token_expiry
+
+    def start_recording(self, path):
+        """Capture the commands API traffic to [path], see HonRecorder"""
+        self.recorder = HonRecorder(self._hass, path)
+        catalogs = get_catalog_storage(self._hass)
+        for appliance in self._appliances:
+            self.recorder.add_appliance(appliance)
+        for appliance in self._appliances:
+            catalog = catalogs.get(get_catalog_key(appliance))
+            if catalog:
+                self.recorder.add_catalog(appliance, catalog)
+
+    async def async_stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            await recorder.async_flush()
+        return recorder
+
     async def async_close(self):
-        await self._session.close()
-        
+        self.async_stop_polling()
+        await self.async_stop_recording()
+        if self._session_owner:
+            await self._session.close()
+
+    @callback
+    def async_start_polling(self):
+        self._polling = True
+        self.async_schedule_poll()
+
+    @callback
+    def async_stop_polling(self):
+        self._polling = False
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+            self._unsub_poll = None
+
+    @callback
+    def async_schedule_poll(self):
+        """Arm the timer at the earliest due time between all appliances"""
+        if not self._polling or self._poll_lock.locked():
+            # A running cycle schedules the next one when it ends
+            return
+        coordinators = [coordinator for coordinator in self._coordinator_dict.values() if coordinator.device is not None]
+        if not coordinators:
+            return
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+        next_poll = min(coordinator.next_poll for coordinator in coordinators)
+        delay = max(next_poll - time.monotonic(), CONTEXT_POLL_MIN_DELAY)
+        self._unsub_poll = async_call_later(self._hass, delay, self._async_poll_due)
+
+    async def _async_poll_due(self, now=None):
+        self._unsub_poll = None
+        await self.async_poll_contexts()
+        self.async_schedule_poll()
+
+    async def async_poll_contexts(self):
+        """Fetch the context of all due appliances in one cycle and fan it out to their coordinators"""
+        if self._poll_lock.locked():
+            _LOGGER.debug("Previous poll cycle still running, skipped")
+            return
+
+        async with self._poll_lock:
+            # Appliances due shortly are polled now to keep request bursts aligned
+            due_time = time.monotonic() + CONTEXT_POLL_ALIGN_WINDOW
+            coordinators = [coordinator for coordinator in self._coordinator_dict.values() if coordinator.device is not None and coordinator.next_poll <= due_time]
+            semaphore = asyncio.Semaphore(CONTEXT_POLL_CONCURRENCY)
+
+            async def fetch(coordinator):
+                async with semaphore:
+                    return await self.get_context(coordinator.device)
+
+            # Time waiting for the cloud, then time spent in our own processing
+            with self.metrics.measure_operation("poll_fetch"):
+                results = await asyncio.gather(*[fetch(coordinator) for coordinator in coordinators], return_exceptions=True)
+
+            with self.metrics.measure_operation("poll_apply"):
+                for coordinator, result in zip(coordinators, results):
+                    await coordinator.async_handle_context(result)
+
     async def async_get_coordinator(self, appliance):
         mac = appliance.get("macAddress", "")
         if mac in self._coordinator_dict:
@@ -124,7 +303,136 @@ class HonConnection:
 
         return 0
 
-    async def async_authorize(self):
+    @property
+    def token_expired(self):
+        return time.time() > self._token_expiry - TOKEN_EXPIRY_MARGIN
+
+    def update_token_expiry(self):
+        expiry = [get_token_expiry(token) for token in [self._id_token, self._cognitoToken]]
+        expiry = [value for value in expiry if value]
+        if expiry:
+            self._token_expiry = min(expiry)
+        else:
+            self._token_expiry = time.time() + SESSION_TIMEOUT
+
+    def store_tokens(self):
+        if self._entry == None:
+            return
+        data = {**self._entry.data}
+        data[CONF_ID_TOKEN] = self._id_token
+        data[CONF_COGNITO_TOKEN] = self._cognitoToken
+        data[CONF_REFRESH_TOKEN] = self._refresh_token
+        data[CONF_TOKEN_EXPIRY] = self._token_expiry
+        self._hass.config_entries.async_update_entry(self._entry, data=data)
+
+    async def async_reauthorize(self, id_token):
+        """Renew the tokens once for all the callers that used the [id_token] ones"""
+        attempt = self._auth_attempt
+        async with self._auth_lock:
+            if attempt != self._auth_attempt:
+                # Renewed or failed while waiting for the lock
+                return self._auth_result
+            if id_token != self._id_token:
+                return True
+            if time.monotonic() < self._auth_retry_at:
+                _LOGGER.debug("hOn tokens renewal failed recently, not attempted")
+                return False
+            _LOGGER.debug("Renewing hOn tokens")
+            self.metrics.reauthorizations += 1
+            result = await self.async_authorize(reuse=False)
+            self._auth_attempt += 1
+            self._auth_result = result
+            self._auth_retry_at = 0 if result else time.monotonic() + REAUTH_COOLDOWN
+            return result
+
+    async def async_api_request(self, method, url, priority=PRIORITY_POLL, **kwargs):
+        """API request returning [status, json], tokens are renewed once if rejected and throttled requests retried"""
+        reauthorized = False
+        throttled = 0
+        while True:
+            if self.token_expired:
+                await self.async_reauthorize(self._id_token)
+            id_token = self._id_token
+            await self._limiter.acquire(priority)
+            with self.metrics.measure(get_endpoint_name(url)) as sample:
+                if "json" in kwargs:
+                    sample.bytes_sent = len(json.dumps(kwargs["json"]))
+                async with self._session.request(method, url, headers=self._headers, **kwargs) as resp:
+                    body = await resp.read()
+                    sample.bytes_received = len(body)
+                    if resp.status >= 400:
+                        sample.error = f"http_{resp.status}"
+                    if resp.status == 429:
+                        self._limiter.throttle(get_retry_after(resp.headers.get("Retry-After")))
+                        if throttled == THROTTLE_RETRIES:
+                            raise HonThrottledError(f"Throttled by [{url}]")
+                        throttled += 1
+                        continue
+                    if resp.status in [401, 403] and not reauthorized:
+                        _LOGGER.debug("Tokens rejected [%s] by [%s]", resp.status, url)
+                    else:
+                        if resp.status < 400:
+                            self._limiter.success()
+                        data = json.loads(body) if body.strip() else None
+                        if not isinstance(data, dict):
+                            raise ValueError(f"Invalid response [{resp.status}] from [{url}]")
+                        if self.recorder is not None:
+                            self.recorder.record(get_endpoint_name(url), kwargs.get("params") or kwargs.get("json") or {}, resp.status, data)
+                        return resp.status, data
+            reauthorized = True
+            await self.async_reauthorize(id_token)
+
+    async def async_authorize(self, reuse=True):
+        with self.metrics.measure_operation("authorize") as sample:
+            result = await self._async_authorize(reuse)
+            if not result:
+                sample.error = "failed"
+            return result
+
+    async def _async_authorize(self, reuse):
+        # Reuse the stored tokens, then the refresh token, then the full login
+        if reuse and self._id_token and self._cognitoToken and not self.token_expired:
+            result = await self.async_get_appliances()
+            if result:
+                _LOGGER.debug("Stored tokens reused")
+                return True
+
+        if self._refresh_token and await self.async_refresh_tokens():
+            result = await self.async_get_appliances()
+            if result:
+                _LOGGER.debug("Tokens refreshed")
+                self.metrics.token_refreshes += 1
+                self.store_tokens()
+                return True
+
+        self._session.cookie_jar.clear()
+        self.metrics.logins += 1
+        if not await self.async_login():
+            return False
+        if not await self.async_get_appliances():
+            return False
+        self.store_tokens()
+        return True
+
+    async def async_refresh_tokens(self):
+        params = {
+            "grant_type": "refresh_token",
+            "client_id": CLIENT_ID,
+            "refresh_token": self._refresh_token
+        }
+        async with self._session.post(f"{AUTH_API}/services/oauth2/token", params=params) as resp:
+            if resp.status != 200:
+                _LOGGER.debug("Unable to refresh the tokens: " + str(resp.status))
+                return False
+            try:
+                json_data = await resp.json()
+                self._id_token = json_data["id_token"]
+            except:
+                _LOGGER.debug("Unable to refresh the tokens, invalid response")
+                return False
+        return await self.async_get_cognito_token()
+
+    async def async_login(self):
 
         if await self.async_get_frontdoor_url(0) == 1:
             return False
@@ -139,7 +447,7 @@ class HonConnection:
         async with self._session.get(url) as resp:
             await resp.text()
             
-        url = f"{AUTH_API}/services/oauth2/authorize?response_type=token+id_token&client_id=3MVG9QDx8IX8nP5T2Ha8ofvlmjLZl5L_gvfbT9.HJvpHGKoAS_dcMN8LYpTSYeVFCraUnV.2Ag1Ki7m4znVO6&redirect_uri=hon%3A%2F%2Fmobilesdk%2Fdetect%2Foauth%2Fdone&display=touch&scope=api%20openid%20refresh_token%20web&nonce=82e9f4d1-140e-4872-9fad-15e25fbf2b7c"
+        url = f"{AUTH_API}/services/oauth2/authorize?response_type=token+id_token&client_id={CLIENT_ID}&redirect_uri=hon%3A%2F%2Fmobilesdk%2Fdetect%2Foauth%2Fdone&display=touch&scope=api%20openid%20refresh_token%20web&nonce=82e9f4d1-140e-4872-9fad-15e25fbf2b7c"
         async with self._session.get(url) as resp:
             text = await resp.text()
             array = []
@@ -148,19 +456,27 @@ class HonConnection:
 
                 if( len(array) == 1 ):
                     #Implement a second way to get the token value
-                    m = re.search('id_token\=(.+?)&', text)
+                    m = re.search(r'id_token=(.+?)&', text)
                     if m:
                         self._id_token = m.group(1)
                     else:
                         _LOGGER.error("Unable to get [id_token] during authorization process (tried both options). Full response [" + text + "]")
                         return False
+                    m = re.search(r'refresh_token=(.+?)&', text)
+                    if m:
+                        self._refresh_token = parse.unquote(m.group(1))
                 else:
                     params = parse.parse_qs(array[1])
                     self._id_token = params["id_token"][0]
+                    if "refresh_token" in params:
+                        self._refresh_token = params["refresh_token"][0]
             except:
                 _LOGGER.error("Unable to get [id_token] during authorization process. Full response [" + text + "]")
                 return False
 
+        return await self.async_get_cognito_token()
+
+    async def async_get_cognito_token(self):
         post_headers = {"id-token": self._id_token}
         data = {
            "os": OS,
@@ -176,20 +492,27 @@ class HonConnection:
                 self._cognitoToken = json_data["cognitoUser"]["Token"]
             except:
                 text = await resp.text()
-                _LOGGER.error("hOn Invalid Data ["+ str(resp.text()) + "] after sending command ["+ str(data)+ "] with headers [" + str(post_headers) + "]. Response: " + text)
+                _LOGGER.error("hOn Invalid Data ["+ str(resp.status) + "] after sending command ["+ str(data)+ "] with headers [" + str(post_headers) + "]. Response: " + text)
                 return False
 
+        self.update_token_expiry()
+        return True
 
+    async def async_get_appliances(self):
         url = f"{API_URL}/commands/v1/appliance"
         async with self._session.get(url,headers=self._headers) as resp:
+            if resp.status in [401, 403]:
+                _LOGGER.debug(f"Tokens rejected [{resp.status}] after GET [{url}]")
+                return False
             try:
                 json_data = await resp.json()
+                appliances = json_data["payload"]["appliances"]
             except:
-                _LOGGER.error("hOn Invalid Data ["+ str(resp.text()) + "] after GET [" + url + "]")
+                _LOGGER.error("hOn Invalid Data ["+ str(resp.status) + "] after GET [" + url + "]")
                 return False
 
-            self._appliances = json_data["payload"]["appliances"]
-            _LOGGER.debug(f"All appliances: {self._appliances}")
+            self._appliances = appliances
+            log_payload("appliances", "All appliances:", payload=self._appliances)
 
             ''' Remove appliances with no mac'''
             self._appliances = [appliance for appliance in self._appliances if "macAddress" in appliance]
@@ -200,7 +523,6 @@ class HonConnection:
             ''' Remove not WM or TD appliances'''
             self._appliances = [appliance for appliance in self._appliances if appliance["applianceTypeName"] in ['WM','TD']]
     
-        self._start_time = time.time()
         return True
 
 
@@ -217,33 +539,53 @@ class HonConnection:
             "series": appliance["series"],
         }
         url = f"{API_URL}/commands/v1/retrieve"
-        async with self._session.get(url, params=params, headers=self._headers) as resp:
-            result = (await resp.json()).get("payload", {})
-            if not result or result.pop("resultCode") != "0":
-                return {}
-            _LOGGER.debug(f"Commands: {result}")
-            return result
+        status, data = await self.async_api_request("GET", url, priority=PRIORITY_CATALOG, params=params)
+        if status >= 400:
+            # Tokens rejected again or server error, not an empty catalog
+            raise UpdateFailed(f"Commands of mac[{appliance['macAddress']}] failed with status {status}")
+        result = data.get("payload", {})
+        if not result or result.pop("resultCode") != "0":
+            return {}
+        log_payload("catalog", "Commands for mac[%s]:", appliance["macAddress"], payload=result)
+        return result
+
+    async def get_aws_token(self):
+        """Signed token for the push channel authorizer"""
+        url = f"{API_URL}/auth/v1/introspection"
+        try:
+            status, json_data = await self.async_api_request("GET", url, priority=PRIORITY_CATALOG)
+            return json_data["payload"]["tokenSigned"]
+        except (ValueError, KeyError):
+            _LOGGER.error("hOn Invalid Data after GET [" + url + "]")
+            return None
 
     async def get_context(self, device):
-        # Create a new hOn session to avoid reaching the expiration
-        elapsed_time = time.time() - self._start_time
-        if( elapsed_time > SESSION_TIMEOUT ):
-            self._session.cookie_jar.clear()
-            await self.async_authorize()
-
         params = {
             "macAddress": device._mac_address,
             "applianceType": device._type_name,
             "category": "CYCLE"
         }
         url = f"{API_URL}/commands/v1/context"
-        async with self._session.get(url, params=params, headers=self._headers) as response:
-            data = await response.json()
-            _LOGGER.debug(f"Context for mac[{device._mac_address}] type [{device._type_name}] {data}")
-            return data.get("payload", {})
+        status, data = await self.async_api_request("GET", url, params=params)
+        if status >= 400:
+            raise UpdateFailed(f"Context of mac[{device._mac_address}] failed with status {status}")
+        log_payload("context", "Context for mac[%s] type [%s]", device._mac_address, device._type_name, payload=data)
+        return data.get("payload", {})
+
 
+    def get_command_queue(self, device):
+        if device._mac not in self._command_queues:
+            self._command_queues[device._mac] = HonCommandQueue(device, self._command_semaphore)
+        return self._command_queues[device._mac]
 
     async def send_command(self, device, command, parameters, program_name = False):
+        """Queued behind the other commands of the appliance, retried on transient failures"""
+        key = (command, json.dumps(parameters, sort_keys=True), program_name)
+        # Built once, a retry resends the same transactionId so the cloud can recognize it
+        args = self.get_command_args(device, command, parameters, program_name)
+        return await self.get_command_queue(device).async_send(key, lambda: self.async_post_command(command, args))
+
+    def get_command_args(self, device, command, parameters, program_name = False):
         now = datetime.utcnow().isoformat()
         args = {
            "macAddress": device._mac_address,
@@ -272,18 +614,20 @@ class HonConnection:
             if type == "WM":
                 type = f"{type}_WD"
             args["programName"] = f"PROGRAMS.{type}.{program_name}"
+        return args
 
-        _LOGGER.debug("Send command")
-        _LOGGER.debug(args)
+    async def async_post_command(self, command, args):
+        log_payload("command", "Send command", payload=args)
 
-        async with self._session.post(f"{API_URL}/commands/v1/send",headers=self._headers,json=args,) as resp:
-            try:
-                data = await resp.json()
-                _LOGGER.debug((f"Command result (send_command): {data}"))
-            except json.JSONDecodeError:
-                _LOGGER.error("hOn Invalid Data ["+ str(resp.text()) + "] after sending command ["+ str(command)+ "]")
-                return False
-            if data["payload"]["resultCode"] == "0":
-                return True
-            _LOGGER.error("hOn command has been rejected. Error message ["+ str(data) + "] sent command ["+ str(command)+ "]")
+        try:
+            status, data = await self.async_api_request("POST", f"{API_URL}/commands/v1/send", priority=PRIORITY_COMMAND, json=args)
+            log_payload("command", "Command result (send_command):", payload=data)
+        except ValueError:
+            _LOGGER.error("hOn Invalid Data after sending command ["+ str(command)+ "]")
+            return False
+        if status >= 500:
+            raise HonCommandError(f"status {status}")
+        if data.get("payload", {}).get("resultCode") == "0":
+            return True
+        _LOGGER.error("hOn command has been rejected. Error message ["+ str(data) + "] sent command ["+ str(command)+ "]")
         return False
\ No newline at end of file
@@ -0,0 +1,46 @@
+import json
+import logging
+from itertools import count
+
+"""
+Payloads are logged by category on child loggers, each one can be enabled
+on its own through the logger integration, for example:
+
+logger:
+  logs:
+    custom_components.hon.payload.context: debug
+    custom_components.hon.trace: debug
+"""
+PAYLOAD_CATEGORIES = ["appliances", "catalog", "context", "command", "push"]
+PAYLOAD_LOG_LIMIT = 2000 # characters of a payload rendered in a debug line
+TRACE_SAMPLE_EVERY = 20 # payloads of a category between two full traces
+
+_PAYLOAD_LOGGERS = {category: logging.getLogger(f"{__package__}.payload.{category}") for category in PAYLOAD_CATEGORIES}
+_TRACE_LOGGER = logging.getLogger(f"{__package__}.trace")
+_TRACE_COUNTERS = {category: count() for category in PAYLOAD_CATEGORIES}
+
+
+class HonPayload:
+    """Rendered only when the record is emitted, truncated to [limit] characters"""
+    def __init__(self, data, limit=PAYLOAD_LOG_LIMIT) -> None:
+        self._data = data
+        self._limit = limit
+
+    def __str__(self):
+        try:
+            text = json.dumps(self._data, default=str, ensure_ascii=False)
+        except (TypeError, ValueError):
+            text = repr(self._data)
+        if self._limit and len(text) > self._limit:
+            return f"{text[:self._limit]}... ({len(text)} chars)"
+        return text
+
+
+def log_payload(category, message, *args, payload=None):
+    """Debug line with a payload, free when the category is disabled"""
+    logger = _PAYLOAD_LOGGERS[category]
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(message + " %s", *args, HonPayload(payload))
+    if _TRACE_LOGGER.isEnabledFor(logging.DEBUG) and next(_TRACE_COUNTERS[category]) % TRACE_SAMPLE_EVERY == 0:
+        # Sampled full payload, whatever its size
+        _TRACE_LOGGER.debug("[%s] " + message + " %s", category, *args, HonPayload(payload, limit=None))
@@ -0,0 +1,141 @@
+import time
+from contextlib import contextmanager
+from urllib import parse
+
+""" Upper bounds in ms of the latency histogram buckets, the last one is unbounded """
+LATENCY_BUCKETS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class HonSample:
+    """Outcome of one measured call, filled by the caller"""
+    def __init__(self) -> None:
+        self.error = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+
+class HonEndpointMetrics:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = {}
+        self.total_ms = 0
+        self.max_ms = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    @property
+    def error_count(self):
+        return sum(self.errors.values())
+
+    def record(self, elapsed_ms, error=None):
+        self.requests += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if elapsed_ms <= bound), len(LATENCY_BUCKETS))
+        self.buckets[index] += 1
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the percentile, None when unbounded"""
+        target = self.requests * fraction
+        count = 0
+        for index, bucket in enumerate(self.buckets):
+            count += bucket
+            if count >= target and count > 0:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else None
+        return None
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": dict(self.errors),
+            "mean_ms": round(self.total_ms / self.requests, 1) if self.requests else None,
+            "max_ms": round(self.max_ms, 1),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "histogram_ms": {str(bound): count for bound, count in zip(LATENCY_BUCKETS + ["inf"], self.buckets)},
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+        }
+
+
+class HonMetrics:
+    """Latency, errors and traffic of the hOn API calls of one account"""
+    def __init__(self) -> None:
+        self.endpoints = {}
+        self.operations = {}
+        self.reauthorizations = 0
+        self.logins = 0
+        self.token_refreshes = 0
+        self.since = time.time()
+
+    def endpoint(self, name):
+        if name not in self.endpoints:
+            self.endpoints[name] = HonEndpointMetrics()
+        return self.endpoints[name]
+
+    def operation(self, name):
+        if name not in self.operations:
+            self.operations[name] = HonEndpointMetrics()
+        return self.operations[name]
+
+    def measure(self, name):
+        """Time one API request"""
+        return self._measure(self.endpoint(name))
+
+    def measure_operation(self, name):
+        """Time a sequence of requests or local processing, kept out of the API totals"""
+        return self._measure(self.operation(name))
+
+    @contextmanager
+    def _measure(self, metrics):
+        sample = HonSample()
+        start = time.perf_counter()
+        try:
+            yield sample
+        except Exception as err:
+            # An exception is counted as an error of its type
+            sample.error = type(err).__name__
+            raise
+        finally:
+            metrics.record((time.perf_counter() - start) * 1000, sample.error)
+            metrics.bytes_sent += sample.bytes_sent
+            metrics.bytes_received += sample.bytes_received
+
+    @property
+    def requests(self):
+        return sum(endpoint.requests for endpoint in self.endpoints.values())
+
+    @property
+    def errors(self):
+        return sum(endpoint.error_count for endpoint in self.endpoints.values())
+
+    @property
+    def mean_ms(self):
+        requests = self.requests
+        if not requests:
+            return None
+        return round(sum(endpoint.total_ms for endpoint in self.endpoints.values()) / requests, 1)
+
+    @property
+    def bytes_received(self):
+        return sum(endpoint.bytes_received for endpoint in self.endpoints.values())
+
+    def as_dict(self):
+        return {
+            "since": self.since,
+            "requests": self.requests,
+            "errors": self.errors,
+            "reauthorizations": self.reauthorizations,
+            "logins": self.logins,
+            "token_refreshes": self.token_refreshes,
+            "endpoints": {name: self.endpoints[name].as_dict() for name in sorted(self.endpoints)},
+            "operations": {name: self.operations[name].as_dict() for name in sorted(self.operations)},
+        }
+
+
+def get_endpoint_name(url):
+    """Path of the URL without the host and the query"""
+    return parse.urlsplit(url).path
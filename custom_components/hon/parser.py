@@ -0,0 +1,42 @@
+from .const import CONTEXT_KEYS, CONTEXT_VALUE_MAPS, SENSORS_DEFAULT
+
+class HonContextParser:
+    """Extracts and normalizes the context fields used for one appliance type"""
+    def __init__(self, type_name) -> None:
+        type_name = type_name.upper()
+
+        self._keys = list(CONTEXT_KEYS)
+        for key in SENSORS_DEFAULT.get(type_name.lower(), {}).get("binary_sensors", {}):
+            if key not in self._keys:
+                self._keys.append(key)
+
+        # {name: {raw value: shown value}}
+        self._value_maps = {}
+        for name in CONTEXT_VALUE_MAPS:
+            groups = CONTEXT_VALUE_MAPS[name].get(type_name, {})
+            self._value_maps[name] = {raw: value for value in groups for raw in groups[value]}
+
+    @property
+    def keys(self):
+        return self._keys
+
+    def normalize(self, name, value):
+        value_map = self._value_maps.get(name)
+        if value_map is None:
+            return value
+        return value_map.get(value, value)
+
+    def parse_context(self, data):
+        """Attributes from a /commands/v1/context payload"""
+        parameters = data.get("shadow", {}).get("parameters", {})
+        attributes = {}
+        for name in self._keys:
+            if name in parameters:
+                attributes[name] = self.normalize(name, parameters[name]["parNewVal"])
+        if "lastConnEvent" in data:
+            attributes["lastConnEvent"] = data["lastConnEvent"]["category"]
+        return attributes
+
+    def parse_parameters(self, parameters):
+        """Attributes from a {name: value} dict"""
+        return {name: self.normalize(name, parameters[name]) for name in parameters if name in self._keys}
@@ -0,0 +1,172 @@
+import logging
+import asyncio
+import importlib.util
+import json
+import secrets
+
+from .const import AWS_ENDPOINT, AWS_AUTHORIZER
+from .logs import log_payload
+
+_LOGGER = logging.getLogger(__name__)
+
+PUSH_RECONNECT_MIN_DELAY = 5 # seconds
+PUSH_RECONNECT_MAX_DELAY = 300 # seconds
+
+class HonPushTransport:
+    """Base class of the push channels, a fake broker only has to implement these methods"""
+    def __init__(self) -> None:
+        self.on_message = None
+        self.on_connection_change = None
+
+    async def async_connect(self):
+        raise NotImplementedError
+
+    async def async_subscribe(self, topics):
+        raise NotImplementedError
+
+    async def async_disconnect(self):
+        raise NotImplementedError
+
+    def message_received(self, topic, payload):
+        if self.on_message:
+            self.on_message(topic, payload)
+
+    def connection_changed(self, connected):
+        if self.on_connection_change:
+            self.on_connection_change(connected)
+
+
+class HonAwsIotTransport(HonPushTransport):
+    """AWS IoT MQTT over websocket used by the hOn app (requires awsiotsdk)"""
+    def __init__(self, hass, hon) -> None:
+        super().__init__()
+        self._hass   = hass
+        self._hon    = hon
+        self._client = None
+
+    @staticmethod
+    def is_installed():
+        return importlib.util.find_spec("awsiot") is not None
+
+    def _threadsafe(self, func, *args):
+        self._hass.loop.call_soon_threadsafe(func, *args)
+
+    async def async_connect(self):
+        from awsiot import mqtt5_client_builder
+
+        token_signed = await self._hon.get_aws_token()
+        if not token_signed:
+            raise ConnectionError("Unable to get the hOn push token")
+
+        self._client = mqtt5_client_builder.websockets_with_custom_authorizer(
+            endpoint=AWS_ENDPOINT,
+            auth_authorizer_name=AWS_AUTHORIZER,
+            auth_authorizer_signature=token_signed,
+            auth_token_key_name="token",
+            auth_token_value=self._hon.id_token,
+            client_id=f"{self._hon.mobile_id}_{secrets.token_hex(8)}",
+            on_lifecycle_connection_success=lambda data: self._threadsafe(self.connection_changed, True),
+            on_lifecycle_disconnection=lambda data: self._threadsafe(self.connection_changed, False),
+            on_lifecycle_stopped=lambda data: self._threadsafe(self.connection_changed, False),
+            on_publish_received=self._on_publish_received,
+        )
+        self._client.start()
+
+    def _on_publish_received(self, data):
+        packet = data.publish_packet
+        try:
+            payload = json.loads(packet.payload.decode())
+        except ValueError:
+            payload = {}
+        self._threadsafe(self.message_received, packet.topic, payload)
+
+    def _subscribe(self, topics):
+        from awscrt import mqtt5
+
+        for topic in topics:
+            self._client.subscribe(mqtt5.SubscribePacket([mqtt5.Subscription(topic)])).result(10)
+
+    async def async_subscribe(self, topics):
+        await self._hass.async_add_executor_job(self._subscribe, topics)
+
+    async def async_disconnect(self):
+        if self._client is not None:
+            self._client.stop()
+            self._client = None
+
+
+class HonPush:
+    """Feeds appliance updates from a push transport, polling takes over while it is down"""
+    def __init__(self, hass, transport) -> None:
+        self._hass      = hass
+        self._transport = transport
+        self._devices   = {}
+        self._topics    = {}
+        self._connected = asyncio.Event()
+        self._lost      = asyncio.Event()
+
+        self._transport.on_message = self._on_message
+        self._transport.on_connection_change = self._on_connection_change
+
+    def add_device(self, device, topics):
+        self._devices[device._mac] = device
+        for topic in topics:
+            self._topics[topic] = device
+
+    @property
+    def connected(self):
+        return self._connected.is_set()
+
+    def _on_connection_change(self, connected):
+        if connected:
+            self._lost.clear()
+            self._connected.set()
+        else:
+            self._connected.clear()
+            self._lost.set()
+            for device in self._devices.values():
+                device.set_push_active(False)
+
+    def _on_message(self, topic, payload):
+        device = self._topics.get(topic)
+        if device is None:
+            return
+        log_payload("push", "Push message on [%s]", topic, payload=payload)
+        if "appliancestatus" in topic:
+            parameters = {parameter["parName"]: parameter["parValue"] for parameter in payload.get("parameters", []) if "parName" in parameter}
+            self._hass.async_create_task(device.process_push(parameters))
+        elif "disconnected" in topic:
+            self._hass.async_create_task(device.process_push({"lastConnEvent": "DISCONNECTED"}))
+        elif "connected" in topic:
+            self._hass.async_create_task(device.process_push({"lastConnEvent": "CONNECTED"}))
+
+    async def async_run(self):
+        """Connect, subscribe and reconnect with backoff until cancelled"""
+        delay = PUSH_RECONNECT_MIN_DELAY
+        while True:
+            try:
+                self._lost.clear()
+                await self._transport.async_connect()
+                await asyncio.wait_for(self._connected.wait(), 30)
+                await self._transport.async_subscribe(list(self._topics))
+                for device in self._devices.values():
+                    device.set_push_active(True)
+                _LOGGER.debug(f"Push channel connected for {list(self._devices)}")
+                delay = PUSH_RECONNECT_MIN_DELAY
+                await self._lost.wait()
+                _LOGGER.debug("Push channel lost, falling back to polling")
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                _LOGGER.warning(f"Unable to start the push channel: {err}")
+                self._on_connection_change(False)
+
+            try:
+                await self._transport.async_disconnect()
+            except Exception:
+                pass
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, PUSH_RECONNECT_MAX_DELAY)
+
+    async def async_stop(self):
+        await self._transport.async_disconnect()
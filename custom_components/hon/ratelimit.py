@@ -0,0 +1,156 @@
+import logging
+import asyncio
+import heapq
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from itertools import count
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+REQUEST_RATE = 10 # requests per second to the hOn API, all accounts together
+REQUEST_BURST = 20
+THROTTLE_DELAY = 10 # seconds of pause after a 429 without Retry-After
+THROTTLE_MAX_DELAY = 300 # seconds, upper bound of an honored Retry-After
+THROTTLE_MIN_RATE = 0.1 # fraction of REQUEST_RATE kept when throttled
+RECOVERY_INTERVAL = 30 # seconds without throttling between two rate increases
+THROTTLE_RETRIES = 2 # attempts of a request again after a 429
+
+""" Lower values are served first """
+PRIORITY_COMMAND = 0
+PRIORITY_CATALOG = 1
+PRIORITY_POLL = 2
+PRIORITY_NAMES = {PRIORITY_COMMAND: "command", PRIORITY_CATALOG: "catalog", PRIORITY_POLL: "poll"}
+
+
+class HonThrottledError(Exception):
+    """Still throttled after the retries"""
+
+
+def get_retry_after(value):
+    """Seconds from a Retry-After header, delta-seconds or HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class HonRateLimiter:
+    """Token bucket shared by the accounts, waiters are served by priority then arrival"""
+    def __init__(self, rate=REQUEST_RATE, burst=REQUEST_BURST) -> None:
+        self._base_rate     = rate
+        self._rate          = rate
+        self._burst         = burst
+        self._tokens        = burst
+        self._updated       = time.monotonic()
+        self._blocked_until = 0
+        self._last_adjust   = 0
+        self._waiters       = [] # heap of (priority, sequence, future)
+        self._sequence      = count()
+        self._timer         = None
+
+        self.granted        = 0
+        self.delayed        = 0
+        self.throttled      = 0
+        self.waited         = 0
+
+    @property
+    def rate(self):
+        return self._rate
+
+    def _refill(self, now):
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def acquire(self, priority=PRIORITY_POLL):
+        now = time.monotonic()
+        self._refill(now)
+        if not self._waiters and now >= self._blocked_until and self._tokens >= 1:
+            self._tokens -= 1
+            self.granted += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self.delayed += 1
+        self._wake()
+        # A cancelled waiter is dropped by _wake
+        await future
+        self.waited += time.monotonic() - now
+
+    def _wake(self):
+        """Serve the waiters the bucket allows, then sleep until the next token"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters and now >= self._blocked_until:
+            future = self._waiters[0][2]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._tokens < 1:
+                break
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            self.granted += 1
+            future.set_result(None)
+
+        if self._waiters:
+            delay = max(self._blocked_until - now, (1 - self._tokens) / self._rate, 0.001)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._wake)
+
+    def throttle(self, retry_after=None):
+        """Server asked to slow down, pause and halve the rate"""
+        now = time.monotonic()
+        delay = min(retry_after if retry_after is not None else THROTTLE_DELAY, THROTTLE_MAX_DELAY)
+        self._blocked_until = max(self._blocked_until, now + delay)
+        self._rate = max(self._base_rate * THROTTLE_MIN_RATE, self._rate / 2)
+        self._tokens = 0
+        self._last_adjust = now
+        self.throttled += 1
+        _LOGGER.warning(f"hOn API throttled, paused for {delay:.0f}s at {self._rate:.2f} requests/s")
+
+    def success(self):
+        """Give the rate back step by step once the throttling is over"""
+        if self._rate >= self._base_rate:
+            return
+        now = time.monotonic()
+        if now - self._last_adjust >= RECOVERY_INTERVAL:
+            self._rate = min(self._base_rate, self._rate + self._base_rate * THROTTLE_MIN_RATE)
+            self._last_adjust = now
+
+    def as_dict(self):
+        queued = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, sequence, future in self._waiters:
+            if not future.done():
+                queued[PRIORITY_NAMES.get(priority, str(priority))] += 1
+        return {
+            "rate": round(self._rate, 2),
+            "base_rate": self._base_rate,
+            "burst": self._burst,
+            "tokens": round(self._tokens, 2),
+            "blocked_for": round(max(self._blocked_until - time.monotonic(), 0), 1),
+            "queued": queued,
+            "granted": self.granted,
+            "delayed": self.delayed,
+            "throttled": self.throttled,
+            "mean_wait_ms": round(self.waited / self.delayed * 1000, 1) if self.delayed else 0,
+        }
+
+
+def get_rate_limiter(hass):
+    data = hass.data.setdefault(DOMAIN, {})
+    if "rate_limiter" not in data:
+        data["rate_limiter"] = HonRateLimiter()
+    return data["rate_limiter"]
@@ -0,0 +1,112 @@
+import logging
+import asyncio
+import gzip
+import json
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+""" Commands API endpoints captured, by the name used in the records """
+RECORDED_ENDPOINTS = {
+    "/commands/v1/retrieve": "retrieve",
+    "/commands/v1/context": "context",
+    "/commands/v1/send": "send",
+}
+
+""" Keys dropped from the captured payloads """
+SANITIZED_KEYS = ["serialNumber", "nickName", "mobileId", "transactionId", "topics"]
+
+RECORDER_FLUSH_SIZE = 200 # records buffered before a write
+
+
+class HonRecorder:
+    """Sanitized capture of the commands API traffic in a gzip JSON lines file
+
+    One record per line: {"t": seconds since the start, "endpoint": name,
+    "appliance": alias, "request": params or body, "status": code, "response": json}.
+    The first records describe the appliances with the endpoint "appliance",
+    followed by "catalog" records holding the catalogs already loaded, which
+    are not requested again while recording.
+    """
+    def __init__(self, hass, path) -> None:
+        self._hass      = hass
+        self._path      = path
+        self._start     = time.monotonic()
+        self._aliases   = {}
+        self._buffer    = []
+        self._count     = 0
+        self._written   = False
+        self._lock      = asyncio.Lock()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def count(self):
+        return self._count
+
+    def alias(self, mac):
+        if mac not in self._aliases:
+            self._aliases[mac] = f"appliance-{len(self._aliases) + 1}"
+        return self._aliases[mac]
+
+    def sanitize(self, data):
+        """Copy of [data] without personal keys and with the mac addresses replaced by aliases"""
+        if isinstance(data, dict):
+            return {key: self.sanitize(value) for key, value in data.items() if key not in SANITIZED_KEYS}
+        if isinstance(data, list):
+            return [self.sanitize(value) for value in data]
+        if isinstance(data, str):
+            for mac, alias in self._aliases.items():
+                if mac in data:
+                    data = data.replace(mac, alias)
+        return data
+
+    def add_appliance(self, appliance):
+        alias = self.alias(appliance["macAddress"])
+        # The alias stands for the serial number a device requires
+        self._append({"t": 0, "endpoint": "appliance", "appliance": alias, "response": {**self.sanitize(appliance), "serialNumber": alias}})
+
+    def add_catalog(self, appliance, catalog):
+        """Programs and settings of the appliance as stored by HonCatalogStorage"""
+        self._append({"t": 0, "endpoint": "catalog", "appliance": self.alias(appliance["macAddress"]), "response": self.sanitize(catalog)})
+
+    def record(self, path, request, status, response):
+        endpoint = RECORDED_ENDPOINTS.get(path)
+        if endpoint is None:
+            return
+        mac = request.get("macAddress", "")
+        self._append({
+            "t": round(time.monotonic() - self._start, 3),
+            "endpoint": endpoint,
+            "appliance": self.alias(mac) if mac else None,
+            "request": self.sanitize(request),
+            "status": status,
+            "response": self.sanitize(response),
+        })
+
+    def _append(self, record):
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+        self._count += 1
+        if len(self._buffer) >= RECORDER_FLUSH_SIZE:
+            self._hass.async_create_task(self.async_flush())
+
+    def _write(self, lines):
+        # A previous capture at the same path is replaced
+        with gzip.open(self._path, "at" if self._written else "wt", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        self._written = True
+
+    async def async_flush(self):
+        # Writes keep the order of the records
+        async with self._lock:
+            lines, self._buffer = self._buffer, []
+            if lines:
+                await self._hass.async_add_executor_job(self._write, lines)
+
+
+def read_records(path):
+    """Records of a capture file, in order"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,83 @@
+import logging
+import math
+from datetime import timedelta
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+DELAY_STEP = 30 # minutes, granularity of the appliance delayTime
+
+
+def get_next_time(value, now):
+    """Next local datetime at the "HH:MM" [value], tomorrow when already passed today"""
+    hour, minute = [int(part) for part in value.split(":")[:2]]
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target = target + timedelta(days=1)
+    return target
+
+
+class HonDelayScheduler:
+    """Delayed start toward a target end time, wakes up only when the delay steps down"""
+    def __init__(self, hass, on_change) -> None:
+        self._hass      = hass
+        self._on_change = on_change
+        self._value     = None # "HH:MM" chosen by the user
+        self._target    = None # local datetime of the end of the program
+        self._unsub     = None
+
+    @property
+    def armed(self):
+        return self._target is not None
+
+    @property
+    def target(self):
+        return self._target
+
+    def get_delay(self, now=None):
+        """Minutes until the target rounded down to the delay step, 0 when not armed"""
+        if self._target is None:
+            return 0
+        now = now or dt_util.now()
+        if self._target <= now:
+            # Not started in time, the same end time tomorrow
+            self._target = get_next_time(self._value, now)
+        minutes = (self._target - now).total_seconds() / 60
+        return math.floor(minutes / DELAY_STEP) * DELAY_STEP
+
+    def arm(self, value):
+        self._value = value
+        self._target = get_next_time(value, dt_util.now())
+        self._schedule()
+
+    def disarm(self):
+        self._value = None
+        self._target = None
+        self._cancel()
+
+    def _cancel(self):
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    def _schedule(self):
+        """Timer at the next step boundary of the delay"""
+        self._cancel()
+        now = dt_util.now()
+        delay = self.get_delay(now)
+        # Just past the boundary, the delay is already one step shorter
+        boundary = self._target - timedelta(minutes=delay) + timedelta(seconds=1)
+        if boundary <= now:
+            boundary = boundary + timedelta(minutes=DELAY_STEP)
+        self._unsub = async_track_point_in_time(self._hass, self._async_step, boundary)
+
+    @callback
+    def _async_step(self, now):
+        self._unsub = None
+        if self._target is None:
+            return
+        self._schedule()
+        self._on_change()
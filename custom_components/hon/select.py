@@ -16,7 +16,7 @@ async def async_setup_entry(hass, entry , async_add_entities) -> None:
 
         coordinator = await hon.async_get_coordinator(appliance)
 
-        for key in coordinator.device.sensors["select"]:
+        for key in coordinator.device.entity_index["select"]:
             default_category = EntityCategory.CONFIG
             if key in ["delayTime", "lang", "waterHard"]:
                 default_category = EntityCategory.DIAGNOSTIC
@@ -56,7 +56,7 @@ async def async_setup_entry(hass, entry , async_add_entities) -> None:
 class HonDelaySelect(HonBaseSelect):
     @property
     def available(self) -> bool:
-        return self._device.get_current_program_param("delayTime") != None and "type" in self._device.get_current_program_param("delayTime") and self._device.is_on and (not self._device.is_running)
+        return self._device.get_current_program_param("delayTime") != None and "type" in self._device.get_current_program_param("delayTime") and self._device.is_available and (not self._device.is_running)
 
     @property
     def current_option(self) -> str | None:
@@ -65,8 +65,8 @@ class HonDelaySelect(HonBaseSelect):
         return self._device._delay_time
 
     async def async_select_option(self, option: str) -> None:
-        self._device._delay_time = option
-        await self.coordinator.async_refresh()
+        self._device.set_delay_time(option)
+        self._device.update_entities()
 
     def coordinator_update(self):
         if not self.available:
@@ -85,7 +85,7 @@ class HonDelaySelect(HonBaseSelect):
 class HonProgramSelect(HonBaseSelect):
     @property
     def available(self) -> bool:
-        return self._device.is_on and (not self._device.is_running)
+        return self._device.is_available and (not self._device.is_running)
 
     @property
     def current_option(self) -> str | None:
@@ -95,7 +95,6 @@ class HonProgramSelect(HonBaseSelect):
 
     async def async_select_option(self, option: str) -> None:
         self._device.set_current_program(option)
-        await self.coordinator.async_refresh()
 
     def coordinator_update(self):
         if not self.available:
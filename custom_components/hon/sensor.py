@@ -0,0 +1,112 @@
+import logging
+from datetime import timedelta
+
+from homeassistant.components.sensor import SensorEntity, SensorEntityDescription, SensorStateClass, SensorDeviceClass
+from homeassistant.const import EntityCategory, UnitOfTime, UnitOfInformation
+from homeassistant.helpers.device_registry import DeviceEntryType
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = timedelta(seconds=60)
+
+METRICS_SENSORS = {
+    "api_requests": {
+        "icon": "mdi:cloud-sync",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+    },
+    "api_errors": {
+        "icon": "mdi:cloud-alert",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+    },
+    "api_latency": {
+        "icon": "mdi:timer-outline",
+        "unit": UnitOfTime.MILLISECONDS,
+        "device_class": SensorDeviceClass.DURATION,
+        "state_class": SensorStateClass.MEASUREMENT,
+    },
+    "api_received": {
+        "icon": "mdi:download-network",
+        "unit": UnitOfInformation.BYTES,
+        "device_class": SensorDeviceClass.DATA_SIZE,
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+    },
+    "reauthorizations": {
+        "icon": "mdi:account-key",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+    },
+}
+
+async def async_setup_entry(hass, entry, async_add_entities) -> None:
+    hon = hass.data[DOMAIN][entry.unique_id]
+    sensors = []
+
+    for key in METRICS_SENSORS:
+        config = METRICS_SENSORS[key]
+        description = SensorEntityDescription(
+            key=key,
+            translation_key=key,
+            icon=config.get("icon"),
+            native_unit_of_measurement=config.get("unit"),
+            device_class=config.get("device_class"),
+            state_class=config.get("state_class"),
+            entity_category=EntityCategory.DIAGNOSTIC,
+            entity_registry_enabled_default=False,
+        )
+        sensors.append(HonMetricsSensor(hon, entry, description))
+
+    async_add_entities(sensors)
+
+
+class HonMetricsSensor(SensorEntity):
+    """API client metrics of one account, read every SCAN_INTERVAL"""
+    def __init__(self, hon, entry, description):
+        self._hon                   = hon
+        self._entry                 = entry
+        self.entity_description     = description
+        self._attr_has_entity_name  = True
+        self._attr_unique_id        = f"{entry.entry_id}_{description.key}"
+
+    @property
+    def device_info(self):
+        return {
+            "identifiers": {
+                (DOMAIN, self._entry.entry_id)
+            },
+            "name": f"hOn {self._entry.title}",
+            "manufacturer": "Haier",
+            "entry_type": DeviceEntryType.SERVICE,
+        }
+
+    @property
+    def native_value(self):
+        metrics = self._hon.metrics
+        key = self.entity_description.key
+        if key == "api_requests":
+            return metrics.requests
+        if key == "api_errors":
+            return metrics.errors
+        if key == "api_latency":
+            return metrics.mean_ms
+        if key == "api_received":
+            return metrics.bytes_received
+        if key == "reauthorizations":
+            return metrics.reauthorizations
+        return None
+
+    @property
+    def extra_state_attributes(self):
+        if self.entity_description.key not in ["api_requests", "api_errors", "api_latency"]:
+            return None
+        endpoints = self._hon.metrics.endpoints
+        attributes = {}
+        for name in sorted(endpoints):
+            endpoint = endpoints[name]
+            if self.entity_description.key == "api_requests":
+                attributes[name] = endpoint.requests
+            elif self.entity_description.key == "api_errors":
+                attributes[name] = dict(endpoint.errors)
+            else:
+                attributes[name] = endpoint.as_dict()["p95_ms"]
+        return attributes
@@ -0,0 +1,167 @@
+import logging
+import asyncio
+import os
+import json
+
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, CONF_PROGRAMS, CONF_SETTINGS
+from .durations import compile_program_durations
+from .discovery import compile_entity_index
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 5 # seconds, coalesces the writes of a catalog refresh
+
+class HonStorage:
+    """One storage file per account, written atomically by the HA Store helper"""
+    def __init__(self, hass, entry) -> None:
+        self._hass  = hass
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+        self._data  = {}
+
+    async def async_load(self):
+        data = await self._store.async_load()
+        if isinstance(data, dict):
+            self._data = data
+
+    def get(self, mac, key):
+        return self._data.get(mac, {}).get(key)
+
+    def set(self, mac, key, value):
+        self._data.setdefault(mac, {})[key] = value
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    def remove(self, mac, key):
+        if key not in self._data.get(mac, {}):
+            return
+        del self._data[mac][key]
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    def _data_to_save(self):
+        return self._data
+
+    async def async_flush(self):
+        await self._store.async_save(self._data)
+
+    async def async_remove(self):
+        """Delete the file of the account, once its config entry is removed"""
+        self._data = {}
+        await self._store.async_remove()
+
+    def import_entry_data(self, entry_data, keys):
+        """Move the per-mac keys of the config entry data here, returns the remaining entry data"""
+        remaining = {}
+        for mac, value in entry_data.items():
+            if not isinstance(value, dict):
+                remaining[mac] = value
+                continue
+            kept = {key: value[key] for key in value if key not in keys}
+            if kept:
+                remaining[mac] = kept
+            for key in keys:
+                if key in value and self.get(mac, key) is None:
+                    self._data.setdefault(mac, {})[key] = value[key]
+        return remaining
+
+    def _legacy_path(self, mac, key):
+        return self._hass.config.path(".storage", DOMAIN, f"{mac}_{key}.json")
+
+    def _read_legacy_files(self, macs):
+        """Read the old {mac}_{key}.json files (executor only)"""
+        result = {}
+        for mac in macs:
+            for key in [CONF_PROGRAMS, CONF_SETTINGS]:
+                data_path = self._legacy_path(mac, key)
+                if not os.path.isfile(data_path):
+                    continue
+                try:
+                    with open(data_path, encoding="utf-8") as f:
+                        result.setdefault(mac, {})[key] = json.load(f)
+                except (OSError, ValueError) as err:
+                    _LOGGER.warning(f"Unable to import legacy storage file [{data_path}]: {err}")
+        return result
+
+    def _remove_legacy_files(self, legacy):
+        """Remove the imported files once the account file is written (executor only)"""
+        for mac in legacy:
+            for key in legacy[mac]:
+                try:
+                    os.remove(self._legacy_path(mac, key))
+                except OSError:
+                    pass
+
+    async def async_import_legacy(self, macs):
+        macs = [mac for mac in macs if mac not in self._data]
+        if not macs:
+            return
+        legacy = await self._hass.async_add_executor_job(self._read_legacy_files, macs)
+        if not legacy:
+            return
+        _LOGGER.debug(f"Imported legacy storage for {list(legacy)}")
+        for mac in legacy:
+            self._data[mac] = legacy[mac]
+        await self.async_flush()
+        await self._hass.async_add_executor_job(self._remove_legacy_files, legacy)
+
+
+def get_catalog_key(appliance):
+    """Appliances with the same model and firmware share the same catalog"""
+    return f"{appliance['applianceModelId']}_{appliance['eepromId']}_{appliance['fwVersion']}"
+
+
+class HonCatalogStorage:
+    """Program catalogs shared by all the accounts, keyed by get_catalog_key"""
+    def __init__(self, hass) -> None:
+        self._store     = Store(hass, STORAGE_VERSION, f"{DOMAIN}.catalogs")
+        self._data      = {}
+        self._locks     = {}
+        self._compiled  = {}
+        self._loaded    = False
+
+    async def async_load(self):
+        if self._loaded:
+            return
+        data = await self._store.async_load()
+        if isinstance(data, dict):
+            self._data = data
+        self._loaded = True
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def _get_compiled(self, name, key, compile):
+        """Structure derived from a catalog, compiled again only when the catalog is replaced"""
+        catalog = self._data.get(key)
+        if catalog is None:
+            return None
+        compiled = self._compiled.setdefault(name, {})
+        if key not in compiled or compiled[key][0] is not catalog:
+            compiled[key] = (catalog, compile(catalog))
+        return compiled[key][1]
+
+    def get_durations(self, key):
+        """Program duration index of a catalog"""
+        return self._get_compiled("durations", key, lambda catalog: compile_program_durations(catalog.get(CONF_PROGRAMS) or {})) or {}
+
+    def get_entity_index(self, key):
+        """Switch and select entities exposed by a catalog"""
+        return self._get_compiled("entities", key, compile_entity_index) or compile_entity_index({})
+
+    def set(self, key, catalog):
+        self._data[key] = catalog
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    def lock(self, key):
+        """Serialize the catalog fetch of identical appliances"""
+        return self._locks.setdefault(key, asyncio.Lock())
+
+    def _data_to_save(self):
+        return self._data
+
+
+def get_catalog_storage(hass):
+    if "catalogs" not in hass.data[DOMAIN]:
+        hass.data[DOMAIN]["catalogs"] = HonCatalogStorage(hass)
+    return hass.data[DOMAIN]["catalogs"]
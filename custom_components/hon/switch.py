@@ -1,6 +1,4 @@
 import logging
-import math
-from datetime import timedelta
 from typing import Any
 
 from homeassistant.helpers.entity import EntityCategory
@@ -8,7 +6,6 @@ from homeassistant.components.switch import SwitchEntityDescription
 
 from .const import DOMAIN, SENSORS_DEFAULT
 from .base import HonBaseSwitch
-from .utils import get_datetime
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,7 +17,9 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
 
         coordinator = await hon.async_get_coordinator(appliance)
 
-        for key in coordinator.device.sensors["switch"]:
+        entity_index = coordinator.device.entity_index
+
+        for key in entity_index["switch"]:
             default_value = SENSORS_DEFAULT.get(key, {})
             description = SwitchEntityDescription(
                 key=key,
@@ -31,7 +30,7 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
             )
             appliances.extend([HonBaseSwitch(coordinator, appliance, description)])
 
-        if "select" in coordinator.device.sensors and "delayTime" in coordinator.device.sensors["select"]:
+        if "delayTime" in entity_index["select"]:
             default_value = SENSORS_DEFAULT.get("delay", {})
             description = SwitchEntityDescription(
                 key="delay",
@@ -52,36 +51,18 @@ class HonDelaySwitch(HonBaseSwitch):
 
     @property
     def is_on(self) -> bool | None:
-        return self.available and int(self._device.get_current_program_param("delayTime")["value"]) > 0
-
-    def set_delay(self):
-        now = get_datetime()
-        now2 = get_datetime()
-
-        delay_hour = int(self._device._delay_time.split(":")[0])
-        delay_minute = int(self._device._delay_time.split(":")[1])
-
-        if int(now2.strftime("%H")) > delay_hour-1:
-            now = now2 + timedelta(days=1)
-
-        delay = int((now.replace(hour=delay_hour, minute=delay_minute, second=00) - now2).total_seconds() / 60)
-        delay = math.floor(delay / 30) * 30
-
-        if int(self._device.get_current_program_param("delayTime")["value"]) != int(delay):
-            self._device.set_current_program_param("delayTime", str(delay))
+        return self.available and self._device.delay_armed
 
     async def async_turn_on(self, **kwargs: Any) -> None:
-        self.set_delay()
+        self._device.arm_delay()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
-        self._device.set_current_program_param("delayTime", "0")
+        self._device.disarm_delay()
 
     def coordinator_update(self):
         if not self.available:
             self._attr_is_on = False
         elif self._device.get_setting("delayTime"):
-            self._attr_is_on = int(self._device.get_current_program_param("delayTime")["value"]) > 0
-            if self._attr_is_on:
-                self.set_delay()
+            self._attr_is_on = self._device.delay_armed
         else:
-            self._attr_is_on = False
\ No newline at end of file
+            self._attr_is_on = False
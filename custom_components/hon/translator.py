@@ -0,0 +1,127 @@
+import logging
+import re
+
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+TRANSLATIONS_STORAGE_VERSION = 1
+TRANSLATIONS_SAVE_DELAY = 10 # seconds
+TRANSLATE_REQUEST_CHARS = 4500 # joined characters per request, the translator accepts up to 5000
+TRANSLATE_SEPARATOR = "\n||\n" # between the joined strings, left untranslated
+TRANSLATE_SEPARATOR_PATTERN = re.compile(r"\s*\|\|\s*")
+
+class HonTranslatorBackend:
+    """Translates a batch of strings, called from the executor"""
+    def translate_batch(self, strings, target):
+        raise NotImplementedError
+
+
+class HonGoogleTranslatorBackend(HonTranslatorBackend):
+    """Joins the strings in as few requests as possible, one request per string when a reply cannot be split back"""
+    def translate_batch(self, strings, target):
+        from deep_translator import GoogleTranslator
+
+        translator = GoogleTranslator(source='auto', target=target)
+        result = []
+        for batch in get_batches(strings):
+            result.extend(self._translate_joined(translator, batch))
+        return result
+
+    def _translate_joined(self, translator, strings):
+        if len(strings) > 1:
+            try:
+                translated = TRANSLATE_SEPARATOR_PATTERN.split(translator.translate(TRANSLATE_SEPARATOR.join(strings)).strip())
+                if len(translated) == len(strings):
+                    return translated
+                _LOGGER.debug("Translation of %s joined strings not split back, translated one by one", len(strings))
+            except Exception as err:
+                _LOGGER.debug("Translation of %s joined strings failed (%s), translated one by one", len(strings), err)
+        return [self._translate_one(translator, string) for string in strings]
+
+    def _translate_one(self, translator, string):
+        try:
+            return translator.translate(string)
+        except Exception as err:
+            _LOGGER.debug("Unable to translate [%s]: %s", string, err)
+            return None
+
+
+def get_batches(strings, limit=TRANSLATE_REQUEST_CHARS):
+    """Consecutive groups of strings joined within [limit] characters, a string holding the separator goes alone"""
+    batch = []
+    size = 0
+    for string in strings:
+        alone = "||" in string or len(string) > limit
+        if batch and (alone or size + len(TRANSLATE_SEPARATOR) + len(string) > limit):
+            yield batch
+            batch = []
+            size = 0
+        if alone:
+            yield [string]
+            continue
+        size += len(string) + (len(TRANSLATE_SEPARATOR) if batch else 0)
+        batch.append(string)
+    if batch:
+        yield batch
+
+
+def get_target_language(language):
+    """Map the Home Assistant language to a translator one"""
+    if language in ["zh-Hans", "zh-CN"]:
+        return "zh-CN"
+    if language in ["zh-Hant", "zh-TW", "zh-HK"]:
+        return "zh-TW"
+    return language.split("-")[0].lower()
+
+
+class HonTranslator:
+    """Translation cache shared by all the accounts, persisted in .storage"""
+    def __init__(self, hass, backend=None) -> None:
+        self._hass      = hass
+        self._backend   = backend or HonGoogleTranslatorBackend()
+        self._store     = Store(hass, TRANSLATIONS_STORAGE_VERSION, f"{DOMAIN}.translations")
+        self._cache     = {}
+        self._loaded    = False
+
+    @property
+    def language(self):
+        return get_target_language(self._hass.config.language)
+
+    async def async_load(self):
+        if self._loaded:
+            return
+        data = await self._store.async_load()
+        if isinstance(data, dict):
+            self._cache = data
+        self._loaded = True
+
+    def _data_to_save(self):
+        return self._cache
+
+    async def async_translate(self, strings):
+        """Translate a list of strings, the original is kept when the translation fails"""
+        await self.async_load()
+        target = self.language
+        cache = self._cache.setdefault(target, {})
+
+        missing = list(dict.fromkeys(string for string in strings if string and string not in cache))
+        if missing:
+            try:
+                translated = await self._hass.async_add_executor_job(self._backend.translate_batch, missing, target)
+                for string, value in zip(missing, translated):
+                    if value:
+                        cache[string] = value
+                self._store.async_delay_save(self._data_to_save, TRANSLATIONS_SAVE_DELAY)
+            except Exception as err:
+                _LOGGER.warning(f"Unable to translate {len(missing)} strings to [{target}]: {err}")
+
+        return [cache.get(string, string) for string in strings]
+
+
+def get_translator(hass):
+    if "translator" not in hass.data[DOMAIN]:
+        hass.data[DOMAIN]["translator"] = HonTranslator(hass)
+    return hass.data[DOMAIN]["translator"]
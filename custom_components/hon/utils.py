@@ -1,9 +1,20 @@
-from datetime import UTC, datetime, timezone
-import pytz
+import base64
+import json
+
+from homeassistant.util import dt as dt_util
 
 def get_datetime(date=None):
+    """Date in the Home Assistant time zone, now by default"""
     if date == None:
-        date = datetime.now()
-    if date.tzinfo != UTC:
-        date = date.astimezone(UTC)
-    return date.astimezone(pytz.timezone('Europe/Rome'))
+        return dt_util.now()
+    return dt_util.as_local(date)
+
+
+def get_token_expiry(token):
+    """Expiry timestamp of a JWT token, None when it can not be read"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except:
+        return None
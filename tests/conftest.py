@@ -0,0 +1,40 @@
+"""Fixtures of the tests, run with python -m pytest from the repository root"""
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fake_hon_api import FakeHonApi
+from benchmarks.run import async_create_hass, async_setup_devices
+from custom_components.hon import hon as hon_module
+from custom_components.hon.const import DOMAIN
+from custom_components.hon.hon import HonConnection
+from custom_components.hon.ratelimit import HonRateLimiter
+
+
+@pytest.fixture
+def hon_account(monkeypatch):
+    """Async context manager of an account on the fake hOn API, with its appliances bootstrapped
+
+    Yields a namespace with hass, entry, api, hon and devices, everything is
+    stopped on exit and the API URLs are restored after the test.
+    """
+    @asynccontextmanager
+    async def account(appliances=1):
+        hass, entry = await async_create_hass("hon_test_", "test")
+        hass.data[DOMAIN]["rate_limiter"] = HonRateLimiter(10000, 10000)
+        api = FakeHonApi(appliances, None, 0)
+        await api.async_start()
+        monkeypatch.setattr(hon_module, "AUTH_API", api.auth_api)
+        monkeypatch.setattr(hon_module, "API_URL", api.api_url)
+        hon = HonConnection(hass, entry)
+        try:
+            await hon.async_authorize()
+            devices, results = await async_setup_devices(hass, entry, hon)
+            yield SimpleNamespace(hass=hass, entry=entry, api=api, hon=hon, devices=devices)
+        finally:
+            await hon.async_close()
+            await api.async_stop()
+            await hass.async_stop(force=True)
+
+    return account
@@ -0,0 +1,51 @@
+"""State of the command queue, kept out of the appliance context"""
+import asyncio
+
+from custom_components.hon import commands
+from custom_components.hon.ratelimit import THROTTLE_RETRIES
+
+
+def test_command_state_is_not_context_data(hon_account):
+    async def run():
+        async with hon_account() as account:
+            device = account.devices[0]
+            attributes = dict(device._attributes)
+            data_generation = device.data_generation
+
+            assert await account.hon.send_command(device, "stopProgram", {"onOffStatus": "0"})
+
+            assert device.command_queue.result == "success"
+            assert device.command_queue.depth == 0
+            assert device._attributes == attributes
+            assert device.data_generation == data_generation
+
+    asyncio.run(run())
+
+
+def test_retry_resends_the_same_command(hon_account, monkeypatch):
+    monkeypatch.setattr(commands, "COMMAND_BACKOFF", 0.01)
+
+    async def run():
+        async with hon_account() as account:
+            account.api.fail_next_sends = 2
+
+            assert await account.hon.send_command(account.devices[0], "startProgram", {"onOffStatus": "1"})
+
+            assert len(account.api.sent) == 3
+            assert len({body["transactionId"] for body in account.api.sent}) == 1
+
+    asyncio.run(run())
+
+
+def test_throttled_command_is_not_retried_again(hon_account):
+    async def run():
+        async with hon_account() as account:
+            account.api.throttle_next = 100
+            account.api.retry_after = "0"
+
+            assert not await account.hon.send_command(account.devices[0], "startProgram", {"onOffStatus": "1"})
+
+            assert account.api.requests["/commands/v1/send"] == THROTTLE_RETRIES + 1
+            assert account.devices[0].command_queue.result == "failure"
+
+    asyncio.run(run())
@@ -0,0 +1,27 @@
+"""Failed context requests reported to the coordinators"""
+import asyncio
+
+import pytest
+
+
+@pytest.mark.parametrize("status", [401, 500])
+def test_failed_context_is_an_update_failure(hon_account, status):
+    async def run():
+        async with hon_account() as account:
+            coordinator = account.devices[0].coordinator
+            account.api.context_status = status
+
+            await coordinator.async_refresh()
+            assert not coordinator.last_update_success
+
+            account.api.context_status = 200
+            coordinator._last_poll = 0
+            await account.hon.async_poll_contexts()
+            assert coordinator.last_update_success
+
+            account.api.context_status = status
+            coordinator._last_poll = 0
+            await account.hon.async_poll_contexts()
+            assert not coordinator.last_update_success
+
+    asyncio.run(run())
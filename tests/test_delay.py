@@ -0,0 +1,41 @@
+"""Delayed start across a reload of the config entry"""
+import asyncio
+
+from benchmarks.run import async_setup_devices
+from custom_components.hon import async_unload_entry
+from custom_components.hon.hon import HonConnection
+
+
+async def async_reload(account):
+    """Unload the entry, then set up the same appliances again from the storage file"""
+    assert await async_unload_entry(account.hass, account.entry)
+    hon = HonConnection(account.hass, account.entry)
+    await hon.async_authorize()
+    devices, results = await async_setup_devices(account.hass, account.entry, hon)
+    return hon, devices
+
+
+def test_armed_delay_is_restored_after_a_reload(hon_account):
+    async def run():
+        async with hon_account(appliances=2) as account:
+            armed, disarmed = account.devices
+            armed.set_delay_time("23:00")
+            armed.arm_delay()
+            disarmed.set_delay_time("21:30")
+            disarmed.arm_delay()
+            disarmed.disarm_delay()
+
+            hon, devices = await async_reload(account)
+            try:
+                armed, disarmed = devices
+                assert armed._delay_time == "23:00"
+                assert armed.delay_armed
+                assert armed._delay_scheduler._unsub is not None
+                assert disarmed._delay_time == "21:30"
+                assert not disarmed.delay_armed
+            finally:
+                for device in devices:
+                    await device.async_shutdown()
+                await hon.async_close()
+
+    asyncio.run(run())
@@ -0,0 +1,76 @@
+"""Push channel over the fake broker, with polling as fallback"""
+import asyncio
+
+from benchmarks.fake_hon_push import FakeHonPushTransport, get_topics
+from custom_components.hon import push as push_module
+from custom_components.hon.const import POLL_INTERVAL_DEFAULT, POLL_INTERVAL_PUSH, CONF_POLL_INTERVAL_RUNNING
+from custom_components.hon.push import HonPush
+
+
+async def wait_until(condition, timeout=2):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+def test_push_messages_and_fallback_to_polling(hon_account, monkeypatch):
+    monkeypatch.setattr(push_module, "PUSH_RECONNECT_MIN_DELAY", 0.01)
+
+    async def run():
+        async with hon_account(appliances=2) as account:
+            first, second = account.devices
+            transport = FakeHonPushTransport()
+            push = HonPush(account.hass, transport)
+            for device in account.devices:
+                push.add_device(device, get_topics(device._mac))
+            task = asyncio.get_running_loop().create_task(push.async_run())
+            try:
+                await wait_until(lambda: first._push_active and second._push_active)
+                assert push.connected
+                assert sorted(transport.subscribed) == sorted(get_topics(first._mac) + get_topics(second._mac))
+                assert first.poll_interval == POLL_INTERVAL_PUSH
+
+                # Routed by topic to its appliance only
+                transport.publish(get_topics(first._mac)[0], {"parameters": [{"parName": "machMode", "parValue": "3"}]})
+                transport.publish("haier/things/unknown/event/appliancestatus/update", {"parameters": [{"parName": "machMode", "parValue": "7"}]})
+                await wait_until(lambda: first.get_data("machMode") == "3")
+                assert second.get_data("machMode") == "2"
+
+                transport.publish(get_topics(second._mac)[2], {})
+                await wait_until(lambda: second.get_data("lastConnEvent") == "DISCONNECTED")
+                transport.publish(get_topics(second._mac)[1], {})
+                await wait_until(lambda: second.get_data("lastConnEvent") == "CONNECTED")
+
+                # Polling takes over while the channel is down
+                transport.drop()
+                assert not push.connected
+                assert second.poll_interval == POLL_INTERVAL_DEFAULT[CONF_POLL_INTERVAL_RUNNING]
+
+                await wait_until(lambda: transport.connects == 2 and second._push_active)
+                assert second.poll_interval == POLL_INTERVAL_PUSH
+            finally:
+                task.cancel()
+                await push.async_stop()
+
+    asyncio.run(run())
+
+
+def test_unreachable_broker_keeps_polling(hon_account, monkeypatch):
+    monkeypatch.setattr(push_module, "PUSH_RECONNECT_MIN_DELAY", 0.01)
+
+    async def run():
+        async with hon_account() as account:
+            device = account.devices[0]
+            transport = FakeHonPushTransport()
+            transport.fail_connect = True
+            push = HonPush(account.hass, transport)
+            push.add_device(device, get_topics(device._mac))
+            task = asyncio.get_running_loop().create_task(push.async_run())
+            try:
+                await wait_until(lambda: transport.connects >= 2)
+                assert not device._push_active
+                assert device.poll_interval == POLL_INTERVAL_DEFAULT[CONF_POLL_INTERVAL_RUNNING]
+            finally:
+                task.cancel()
+
+    asyncio.run(run())
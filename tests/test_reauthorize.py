@@ -0,0 +1,35 @@
+"""Single-flight renewal of the hOn tokens"""
+import asyncio
+
+from benchmarks.run import async_create_hass
+from custom_components.hon.hon import HonConnection
+
+
+async def async_concurrent_failing_renewals(callers):
+    hass, entry = await async_create_hass("hon_test_", "test")
+    hon = HonConnection(hass, entry)
+    hon._id_token = "expired"
+    attempts = []
+
+    async def failing_authorize(reuse):
+        attempts.append(reuse)
+        await asyncio.sleep(0.01)
+        return False
+
+    hon._async_authorize = failing_authorize
+    try:
+        first = await asyncio.gather(*[hon.async_reauthorize("expired") for _ in range(callers)])
+        # Within the cooldown the failure is returned without a login
+        second = await asyncio.gather(*[hon.async_reauthorize("expired") for _ in range(callers)])
+        return first, second, len(attempts)
+    finally:
+        await hon.async_close()
+        await hass.async_stop(force=True)
+
+
+def test_failed_renewal_is_shared_by_the_waiters():
+    first, second, attempts = asyncio.run(async_concurrent_failing_renewals(6))
+
+    assert first == [False] * 6
+    assert second == [False] * 6
+    assert attempts == 1
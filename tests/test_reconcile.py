@@ -0,0 +1,37 @@
+"""Optimistic values of the commands against the contexts read back"""
+import asyncio
+
+
+def test_optimistic_value_kept_until_the_deadline(hon_account):
+    async def run():
+        async with hon_account() as account:
+            device = account.devices[0]
+            # The fake appliance keeps reporting machMode 2, running
+            device.expect({"machMode": "3"})
+
+            await device._async_reconcile()
+            assert device.get_data("machMode") == "3"
+            assert device._unsub_reconcile is not None
+            assert device._reconcile_delay == 2 * 5
+
+            value, deadline = device._expectations["machMode"]
+            device._expectations["machMode"] = (value, 0)
+            await device._async_reconcile()
+            assert device.get_data("machMode") == "2"
+            assert device._expectations == {}
+            assert device._unsub_reconcile is None
+
+    asyncio.run(run())
+
+
+def test_confirmed_value_stops_the_read_back(hon_account):
+    async def run():
+        async with hon_account() as account:
+            device = account.devices[0]
+            device.expect({"machMode": "2"})
+
+            await device.get_context()
+            assert device._expectations == {}
+            assert device._unsub_reconcile is None
+
+    asyncio.run(run())
@@ -0,0 +1,23 @@
+"""Captures of the recorder replayed by benchmarks/replay.py"""
+import asyncio
+from argparse import Namespace
+
+from benchmarks import replay
+from custom_components.hon import hon as hon_module
+
+
+def record_and_replay(path, late):
+    asyncio.run(replay.async_record(Namespace(capture=str(path), appliances=2, polls=3, interval=0.05, late=late)))
+    return asyncio.run(replay.async_replay(Namespace(capture=str(path), speed=0, output=None)))
+
+
+def test_recording_started_after_bootstrap_keeps_the_catalogs(tmp_path, monkeypatch):
+    # The record mode points the hon module at the fake hOn API, restored after the test
+    monkeypatch.setattr(hon_module, "AUTH_API", hon_module.AUTH_API)
+    monkeypatch.setattr(hon_module, "API_URL", hon_module.API_URL)
+    cold = record_and_replay(tmp_path / "cold.jsonl.gz", late=False)
+    late = record_and_replay(tmp_path / "late.jsonl.gz", late=True)
+
+    assert late["appliances"] == cold["appliances"] == 2
+    assert late["entities"] == cold["entities"]
+    assert late["contexts"] > 0
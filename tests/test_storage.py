@@ -0,0 +1,22 @@
+"""Storage file of an account"""
+import asyncio
+import os
+
+from custom_components.hon import async_remove_entry, async_unload_entry
+from custom_components.hon.const import DOMAIN
+
+
+def test_removed_entry_deletes_its_storage(hon_account):
+    async def run():
+        async with hon_account() as account:
+            path = account.hass.config.path(".storage", f"{DOMAIN}.{account.entry.entry_id}")
+            account.hon.storage.set(account.devices[0]._mac, "current_program", "program_1")
+            await account.hon.storage.async_flush()
+            assert os.path.exists(path)
+
+            # Unloaded first, as Home Assistant does before a removal
+            assert await async_unload_entry(account.hass, account.entry)
+            await async_remove_entry(account.hass, account.entry)
+            assert not os.path.exists(path)
+
+    asyncio.run(run())
@@ -0,0 +1,52 @@
+"""Joined requests of the Google translator backend"""
+import deep_translator
+
+from custom_components.hon.translator import HonGoogleTranslatorBackend, get_batches
+
+
+class FakeGoogleTranslator:
+    requests = []
+    keep_separator = True
+
+    def __init__(self, source, target):
+        pass
+
+    def translate(self, text):
+        FakeGoogleTranslator.requests.append(text)
+        if not FakeGoogleTranslator.keep_separator:
+            text = text.replace("||", "")
+        return text.upper()
+
+
+def translate(monkeypatch, strings, keep_separator=True):
+    monkeypatch.setattr(deep_translator, "GoogleTranslator", FakeGoogleTranslator)
+    FakeGoogleTranslator.requests = []
+    FakeGoogleTranslator.keep_separator = keep_separator
+    return HonGoogleTranslatorBackend().translate_batch(strings, "it"), len(FakeGoogleTranslator.requests)
+
+
+def test_strings_are_joined_in_one_request(monkeypatch):
+    strings = [f"Program number {index}" for index in range(20)]
+
+    translated, requests = translate(monkeypatch, strings)
+
+    assert translated == [string.upper() for string in strings]
+    assert requests == 1
+
+
+def test_reply_not_split_back_is_translated_one_by_one(monkeypatch):
+    strings = ["Cotton", "Wool", "Mixed"]
+
+    translated, requests = translate(monkeypatch, strings, keep_separator=False)
+
+    assert translated == ["COTTON", "WOOL", "MIXED"]
+    assert requests == 1 + 3
+
+
+def test_batches_stay_within_the_limit():
+    strings = ["a" * 40] * 10 + ["a || b"]
+
+    batches = list(get_batches(strings, limit=100))
+
+    assert [len(batch) for batch in batches] == [2, 2, 2, 2, 2, 1]
+    assert batches[-1] == ["a || b"]
@@ -0,0 +1,24 @@
+"""Timers of the devices after an unload of the config entry"""
+import asyncio
+
+from custom_components.hon import async_unload_entry
+
+
+def test_unload_cancels_the_device_timers(hon_account):
+    async def run():
+        async with hon_account(appliances=2) as account:
+            for device in account.devices:
+                device.set_delay_time("23:00")
+                device.arm_delay()
+                device.expect({"machMode": "2"})
+                assert device._delay_scheduler._unsub is not None
+                assert device._unsub_reconcile is not None
+
+            assert await async_unload_entry(account.hass, account.entry)
+
+            for device in account.devices:
+                assert device._delay_scheduler._unsub is None
+                assert device._unsub_reconcile is None
+                assert not device.delay_armed
+
+    asyncio.run(run())